@@ -0,0 +1,86 @@
+"""Measure in-process latency of ``GET /auth/check/``.
+
+The endpoint answers reverse proxy ``auth_request`` subrequests, so every
+proxied request pays for it. The target is a p99 under ``--target-p99-ms``
+with the token payload cache warm; the cold run bypasses the cache to show
+the cost of a token store lookup. Run from the project root with::
+
+    python -m benchmarks.auth_check_bench --requests 5000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI
+
+from httpx import ASGITransport, AsyncClient
+
+from src.api.v1.auth.routes import router as auth_router
+from src.api.v1.users.dependencies import get_token_store
+from src.api.v1.users.utils.my_jwt import create_jwt
+from src.api.v1.users.utils.token_cache import token_payload_cache
+from src.api.v1.users.utils.token_store import InMemoryTokenStore
+from src.settings import JWTSettings
+
+CHECK_URL = "/auth/check/"
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    return samples[min(int(len(samples) * percent), len(samples) - 1)]
+
+
+async def measure(
+    client: AsyncClient, token: str, requests: int, warm: bool
+) -> list[float]:
+    headers = {"Authorization": f"Bearer {token}"}
+    samples = []
+    for _ in range(requests):
+        if not warm:
+            token_payload_cache.clear()
+        started = time.perf_counter()
+        response = await client.get(CHECK_URL, headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 204, response.text
+    return sorted(samples)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--target-p99-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    token_store = InMemoryTokenStore()
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.dependency_overrides[get_token_store] = lambda: token_store
+
+    claims = {"sub": "bench@example.com", "id": 1, "role": "user", "rv": 0}
+    token, payload = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, claims, 3600)
+    await token_store.save((token, payload))
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        results = {
+            "warm": await measure(client, token, args.requests, warm=True),
+            "cold": await measure(client, token, args.requests, warm=False),
+        }
+
+    print(f"{'':6}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'req/s':>10}")
+    for name, samples in results.items():
+        mean = statistics.fmean(samples)
+        print(
+            f"{name:6}{percentile(samples, 0.5):10.3f}"
+            f"{percentile(samples, 0.99):10.3f}{mean:10.3f}{1000 / mean:10.0f}"
+        )
+
+    warm_p99 = percentile(results["warm"], 0.99)
+    verdict = "met" if warm_p99 <= args.target_p99_ms else "missed"
+    print(f"target p99 {args.target_p99_ms} ms {verdict}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""Compare tokens/sec of the precompiled JWT engine against plain PyJWT.
+
+Run from the project root with the environment loaded::
+
+    python -m benchmarks.jwt_bench --iterations 20000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable
+from uuid import uuid4
+
+import jwt
+
+from src.api.v1.users.utils.keys import get_key_ring
+from src.api.v1.users.utils.my_jwt import create_jwt, verify_jwt
+from src.settings import JWTSettings
+
+TOKEN_DATA = {
+    "sub": "bench@example.com",
+    "id": 1,
+    "is_active": True,
+    "token_revoked": False,
+    "sid": uuid4().hex,
+    "gen": 0,
+}
+
+
+def legacy_create_jwt(
+    token_type: str, token_data: dict, expire_time_seconds: int
+) -> str:
+    key = get_key_ring().active
+    now = datetime.utcnow()
+    payload = {
+        "type": token_type,
+        "iat": now,
+        "exp": now + timedelta(seconds=expire_time_seconds),
+        "jti": uuid4().hex,
+        **token_data,
+    }
+    return jwt.encode(
+        payload,
+        key=key.signing_key,
+        algorithm=key.algorithm,
+        headers={"kid": key.kid},
+    )
+
+
+def legacy_verify_jwt(token: str) -> dict[str, Any]:
+    key = get_key_ring().get(jwt.get_unverified_header(token).get("kid"))
+    return jwt.decode(
+        token,
+        key=key.verification_key,
+        algorithms=[key.algorithm],
+        options={"require": ["exp", "iat", "jti", "type"]},
+    )
+
+
+def measure(func: Callable[[], Any], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    iterations = parser.parse_args().iterations
+
+    args = (
+        JWTSettings.ACCESS_TOKEN_TYPE,
+        TOKEN_DATA,
+        JWTSettings.ACCESS_TOKEN_EXPIRE_SECONDS,
+    )
+    token, _ = create_jwt(*args)
+    legacy_token = legacy_create_jwt(*args)
+
+    results = {
+        "sign": (
+            measure(lambda: legacy_create_jwt(*args), iterations),
+            measure(lambda: create_jwt(*args), iterations),
+        ),
+        "verify": (
+            measure(lambda: legacy_verify_jwt(legacy_token), iterations),
+            measure(lambda: verify_jwt(token), iterations),
+        ),
+    }
+
+    print(f"{'':8}{'pyjwt/s':>12}{'engine/s':>12}{'speedup':>10}")
+    for name, (legacy, engine) in results.items():
+        print(f"{name:8}{legacy:12.0f}{engine:12.0f}{engine / legacy:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
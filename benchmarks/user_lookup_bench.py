@@ -0,0 +1,92 @@
+"""Compare per-lookup latency of the ORM and the asyncpg fast path.
+
+Each lookup kind is run ``--iterations`` times against the database
+configured in the environment, the ORM lookups with a fresh session per
+lookup as a request would. Run from the project root with a user that
+exists::
+
+    python -m benchmarks.user_lookup_bench --email user@example.com
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable
+
+from src.api.v1.users import crud, fast_crud
+from src.db.session import EnginePool, close_dbs, get_async_pool, s
+from src.settings import DbSettings
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    return samples[min(int(len(samples) * percent), len(samples) - 1)]
+
+
+async def measure(
+    lookup: Callable[[], Awaitable[Any]], iterations: int
+) -> list[float]:
+    await lookup()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        assert await lookup() is not None
+        samples.append((time.perf_counter() - started) * 1000)
+    return sorted(samples)
+
+
+def orm_lookup(
+    pool: EnginePool, query: Callable[[], Awaitable[Any]]
+) -> Callable[[], Awaitable[Any]]:
+    async def lookup() -> Any:
+        async with pool.maker() as session:
+            s.user_db = session
+            return await query()
+
+    return lookup
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    pool = await get_async_pool(DbSettings.get_async_db_url())
+    if (user := await fast_crud.get_user_by_email(args.email)) is None:
+        parser.error(f"No user with email {args.email}")
+    user_id = user.id
+
+    async def orm_balance() -> int | None:
+        user = await crud.get_user_by_id(user_id)
+        return None if user is None else user.balance
+
+    lookups = {
+        "orm user by email": orm_lookup(
+            pool, lambda: crud.get_user_by_email(args.email)
+        ),
+        "fast user by email": lambda: fast_crud.get_user_by_email(args.email),
+        "orm user by id": orm_lookup(
+            pool, lambda: crud.get_user_by_id(user_id)
+        ),
+        "fast user by id": lambda: fast_crud.get_user_by_id(user_id),
+        "orm balance by id": orm_lookup(pool, orm_balance),
+        "fast balance by id": lambda: fast_crud.get_balance_by_id(user_id),
+    }
+
+    print(f"{'':20}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    try:
+        for name, lookup in lookups.items():
+            samples = await measure(lookup, args.iterations)
+            print(
+                f"{name:20}{percentile(samples, 0.5):10.3f}"
+                f"{percentile(samples, 0.99):10.3f}"
+                f"{statistics.fmean(samples):10.3f}"
+            )
+    finally:
+        await fast_crud.user_fast_path.close()
+        await close_dbs()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
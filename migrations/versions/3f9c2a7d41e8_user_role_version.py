@@ -0,0 +1,34 @@
+"""User role version
+
+Revision ID: 3f9c2a7d41e8
+Revises: 665bd3a93b6e
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41e8'
+down_revision: Union[str, None] = '665bd3a93b6e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column(
+            'role_version',
+            sa.Integer(),
+            server_default=sa.text('0'),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'role_version')
@@ -0,0 +1,56 @@
+"""Admin user listing indexes
+
+Revision ID: 665bd3a93b6e
+Revises: bb962bf8d127
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '665bd3a93b6e'
+down_revision: Union[str, None] = 'bb962bf8d127'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name, columns, partial index predicate
+INDEXES = (
+    ('ix_users_first_name', ['first_name'], None),
+    ('ix_users_last_name', ['last_name'], None),
+    ('ix_users_balance', ['balance'], None),
+    ('ix_users_updated_at', ['updated_at'], None),
+    ('ix_users_blocked', ['id'], 'is_blocked'),
+    ('ix_users_deleted', ['id'], 'is_deleted'),
+    ('ix_users_inactive', ['id'], 'NOT is_active'),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY does not lock writes but cannot run inside a
+    # transaction. A failed concurrent build leaves an invalid index behind,
+    # drop it before running the upgrade again.
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name,
+                'users',
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=None if where is None else sa.text(where),
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name='users',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -2,6 +2,8 @@ from fastapi import HTTPException
 
 from starlette import status
 
+from src.settings import AdmissionSettings
+
 CREDENTIAL_EXCEPTIONS = HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,
     detail="Invalid user credentials",
@@ -53,12 +55,24 @@ INVALID_USER_CACHE_ID_EXCEPTION = HTTPException(
     headers={"WWW-Authenticate": "Bearer"},
 )
 
+EXPIRED_TOKEN_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Token has expired",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
 REVOKED_TOKEN_ERROR = HTTPException(
     status_code=status.HTTP_403_FORBIDDEN,
     detail="Token has been revoked",
     headers={"WWW-Authenticate": "Bearer"},
 )
 
+REFRESH_TOKEN_REUSED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN,
+    detail="Refresh token reuse detected, session has been revoked",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
 NEGATIVE_BALANCE_ERROR = HTTPException(
     status_code=status.HTTP_409_CONFLICT,
     detail="Balance cannot be negative",
@@ -90,3 +104,29 @@ ADMIN_BLOCK_ITSELF_EXCEPTION = HTTPException(
     status_code=status.HTTP_409_CONFLICT,
     detail="Admin cannot block itself",
 )
+
+ADMIN_CHANGE_OWN_ROLE_EXCEPTION = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="Admin cannot change its own role",
+)
+
+ADMIN_BALANCE_EXCEPTION = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="Admin users cannot have a balance",
+)
+
+INVALID_INTROSPECTION_SECRET_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid introspection secret",
+)
+
+SERVICE_OVERLOADED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Service is overloaded, retry later",
+    headers={"Retry-After": str(AdmissionSettings.retry_after_seconds)},
+)
+
+TOO_MANY_REQUESTS_EXCEPTION = HTTPException(
+    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    detail="Too many requests",
+)
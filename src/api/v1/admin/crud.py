@@ -1,11 +1,17 @@
-from sqlalchemy import ScalarResult, asc, desc, select
+from sqlalchemy import ColumnElement, ScalarResult, Select, asc, desc, select
 
 from src.api.v1.admin.models.admin_query_params import AdminQueryParams
 from src.db.models import User
 from src.db.session import s
 
 
-async def filtered_users(params: AdminQueryParams) -> ScalarResult[User]:
+def _flag(column: ColumnElement[bool], value: bool) -> ColumnElement[bool]:
+    """Boolean filters are rendered without bind parameters, so that the
+    planner can match them against the partial indexes."""
+    return column if value else ~column
+
+
+def filtered_users_query(params: AdminQueryParams) -> Select:
     query = select(User)
 
     if params.user_id is not None:
@@ -17,11 +23,11 @@ async def filtered_users(params: AdminQueryParams) -> ScalarResult[User]:
     if params.last_name is not None:
         query = query.filter(User.last_name == params.last_name)
     if params.is_active is not None:
-        query = query.filter(User.is_active == params.is_active)
+        query = query.filter(_flag(User.is_active, params.is_active))
     if params.is_blocked is not None:
-        query = query.filter(User.is_blocked == params.is_blocked)
+        query = query.filter(_flag(User.is_blocked, params.is_blocked))
     if params.is_deleted is not None:
-        query = query.filter(User.is_blocked == params.is_deleted)
+        query = query.filter(_flag(User.is_deleted, params.is_deleted))
 
     if params.order_by is not None and params.order_by in [
         "id",
@@ -31,4 +37,12 @@ async def filtered_users(params: AdminQueryParams) -> ScalarResult[User]:
         order_func = desc if params.order_type == "desc" else asc
         query = query.order_by(order_func(getattr(User, params.order_by)))
 
-    return await s.user_db.scalars(query)
+    if params.limit is not None:
+        query = query.limit(params.limit)
+    if params.offset:
+        query = query.offset(params.offset)
+    return query
+
+
+async def filtered_users(params: AdminQueryParams) -> ScalarResult[User]:
+    return await s.read_db.scalars(filtered_users_query(params))
@@ -1,10 +1,22 @@
+from typing import Callable
+
 from fastapi import Depends
 
 from src.api.exceptions import NOT_FOUND
-from src.api.v1.users.dependencies import get_current_user
-from src.db.models import User
+from src.api.v1.users.dependencies import get_token_permissions
+from src.api.v1.users.utils.permissions import Permission
+
+
+def require_permission(permission: Permission) -> Callable[..., None]:
+    def check_permission(
+        permissions: Permission = Depends(get_token_permissions),
+    ) -> None:
+        """Authorized from the token claims, without loading the user."""
+        if permission not in permissions:
+            raise NOT_FOUND
+
+    return check_permission
 
 
-def check_admin_role(user: User = Depends(get_current_user)) -> None:
-    if user.role != "admin":
-        raise NOT_FOUND
+check_admin_role = require_permission(Permission.MANAGE_USERS)
+check_metrics_permission = require_permission(Permission.READ_METRICS)
@@ -16,3 +16,7 @@ class AdminQueryParams:
         None, description="Field to order by (id, balance, last_activity_at)"
     )
     order_type: str | None = Query("asc", description="Order type (asc, desc)")
+    limit: int | None = Query(
+        None, ge=1, le=1000, description="Page size, all users when unset"
+    )
+    offset: int = Query(0, ge=0, description="Users to skip")
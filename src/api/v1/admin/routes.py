@@ -1,30 +1,46 @@
 import logging
+from typing import Any
 
 from fastapi import APIRouter, Depends
 
 from starlette import status
 
 from src.api.exceptions import (
+    ADMIN_BALANCE_EXCEPTION,
     ADMIN_BLOCK_ITSELF_EXCEPTION,
+    ADMIN_CHANGE_OWN_ROLE_EXCEPTION,
     ALREADY_BLOCKED_EXCEPTION,
     NOT_BLOCKED_EXCEPTION,
     NOT_FOUND,
 )
 from src.api.v1.admin.crud import filtered_users
-from src.api.v1.admin.dependencies import check_admin_role
+from src.api.v1.admin.dependencies import (
+    check_admin_role,
+    check_metrics_permission,
+)
 from src.api.v1.admin.models.admin_query_params import AdminQueryParams
 from src.api.v1.users.crud import (
     block_my_user,
+    change_user_role,
     get_user_by_id,
     unblock_my_user,
 )
-from src.api.v1.users.dependencies import get_current_user
+from src.api.v1.users.dependencies import get_current_user, get_token_store
 from src.api.v1.users.models.user import (
     BlockUserSchema,
+    ChangeRoleSchema,
     UserResponseSchema,
+    UserRoleSchema,
     UsersResponseSchema,
 )
-from src.db.models import User
+from src.api.v1.users.utils.admission import admission_controllers
+from src.api.v1.users.utils.password import password_hasher
+from src.api.v1.users.utils.permissions import ADMIN_ROLE
+from src.api.v1.users.utils.principal import AuthPrincipal
+from src.api.v1.users.utils.token_cache import token_payload_cache
+from src.api.v1.users.utils.token_store import TokenStore
+from src.api.v1.users.utils.user_cache import user_cache
+from src.db.session import get_pool_stats, replica_router
 
 log = logging.getLogger(__name__)
 
@@ -34,6 +50,12 @@ router = APIRouter(
     dependencies=[Depends(check_admin_role)],
 )  # include_in_schema=False
 
+metrics_router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(check_metrics_permission)],
+)
+
 
 @router.get(
     "/users/",
@@ -55,7 +77,9 @@ async def get_users(
     responses={status.HTTP_200_OK: {"model": BlockUserSchema}},
 )
 async def block_user(
-    user_id: int, admin_user: User = Depends(get_current_user)
+    user_id: int,
+    admin_user: AuthPrincipal = Depends(get_current_user),
+    token_store: TokenStore = Depends(get_token_store),
 ) -> BlockUserSchema:
     if (user := await get_user_by_id(user_id)) is None:
         raise NOT_FOUND
@@ -65,6 +89,7 @@ async def block_user(
         raise ALREADY_BLOCKED_EXCEPTION
 
     await block_my_user(user)
+    await token_store.revoke_all(user.id)
     log.info(f"User {user.email} blocked successfully")
     return BlockUserSchema.model_validate(user)
 
@@ -83,3 +108,45 @@ async def unblock_user(user_id: int) -> BlockUserSchema:
     await unblock_my_user(user)
     log.info(f"User {user.email} unblocked successfully")
     return BlockUserSchema.model_validate(user)
+
+
+@router.patch(
+    "/role/{user_id}/",
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_200_OK: {"model": UserRoleSchema}},
+)
+async def change_role(
+    user_id: int,
+    payload: ChangeRoleSchema,
+    admin_user: AuthPrincipal = Depends(get_current_user),
+    token_store: TokenStore = Depends(get_token_store),
+) -> UserRoleSchema:
+    """Permission claims of tokens issued before the change no longer match
+    the published role version and are re-checked against the new role."""
+    if (user := await get_user_by_id(user_id)) is None:
+        raise NOT_FOUND
+    if user.id == admin_user.id:
+        raise ADMIN_CHANGE_OWN_ROLE_EXCEPTION
+    if payload.role == ADMIN_ROLE and user.balance:
+        raise ADMIN_BALANCE_EXCEPTION
+
+    if payload.role != user.role:
+        await change_user_role(user, payload.role)
+        await token_store.set_role_version(user.id, user.role_version)
+        log.info(f"User {user.email} role changed to {payload.role}")
+    return UserRoleSchema.model_validate(user)
+
+
+@metrics_router.get("/metrics/", status_code=status.HTTP_200_OK)
+async def get_metrics() -> dict[str, dict[str, Any]]:
+    return {
+        "token_cache": token_payload_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "db_pools": get_pool_stats(),
+        "db_replicas": replica_router.stats(),
+        "admission": {
+            controller.name: controller.stats()
+            for controller in admission_controllers
+        },
+    }
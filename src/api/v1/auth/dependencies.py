@@ -0,0 +1,24 @@
+import hmac
+
+from fastapi import Header
+
+from src.api.exceptions import (
+    INVALID_INTROSPECTION_SECRET_EXCEPTION,
+    NOT_FOUND,
+)
+from src.settings import IntrospectionSettings
+
+
+def check_introspection_secret(
+    secret: str | None = Header(
+        None, alias=IntrospectionSettings.SECRET_HEADER
+    ),
+) -> None:
+    """Introspection is only served to internal services sharing the
+    ``INTROSPECTION_SECRET``, it is disabled while the secret is unset."""
+    if not IntrospectionSettings.secret:
+        raise NOT_FOUND
+    if secret is None or not hmac.compare_digest(
+        secret.encode(), IntrospectionSettings.secret.encode()
+    ):
+        raise INVALID_INTROSPECTION_SECRET_EXCEPTION
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+
+from src.settings import IntrospectionSettings
+
+
+class IntrospectionRequestSchema(BaseModel):
+    tokens: list[str] = Field(
+        min_length=1, max_length=IntrospectionSettings.max_tokens
+    )
+
+
+class TokenIntrospectionSchema(BaseModel):
+    active: bool
+    token_type: str | None = None
+    sub: str | None = None
+    user_id: int | None = None
+    sid: str | None = None
+    exp: int | None = None
+    iat: int | None = None
+    jti: str | None = None
+
+
+class IntrospectionResponseSchema(BaseModel):
+    tokens: list[TokenIntrospectionSchema] = Field(
+        description="Introspection results in the order of the request."
+    )
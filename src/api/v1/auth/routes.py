@@ -0,0 +1,117 @@
+import logging
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from starlette import status
+
+from src.api.exceptions import INVALID_TOKEN_CREDENTIAL_EXCEPTION
+from src.api.v1.auth.dependencies import check_introspection_secret
+from src.api.v1.auth.models.introspection import (
+    IntrospectionRequestSchema,
+    IntrospectionResponseSchema,
+    TokenIntrospectionSchema,
+)
+from src.api.v1.users.dependencies import (
+    get_read_only_user_by_email,
+    get_token_payload,
+    get_token_payloads,
+    get_token_store,
+    has_current_role,
+    oauth2_scheme,
+    validate_access_token_payload,
+)
+from src.api.v1.users.utils.my_jwt import wall_clock
+from src.api.v1.users.utils.token_store import TokenStore
+from src.settings import AuthCheckSettings
+
+log = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+def introspection_result(
+    payload: dict[str, Any] | None,
+) -> TokenIntrospectionSchema:
+    if payload is None or payload.get("token_revoked") is True:
+        return TokenIntrospectionSchema(active=False)
+
+    return TokenIntrospectionSchema(
+        active=True,
+        token_type=payload.get("type"),
+        sub=payload.get("sub"),
+        user_id=payload.get("id"),
+        sid=payload.get("sid"),
+        exp=payload.get("exp"),
+        iat=payload.get("iat"),
+        jti=payload.get("jti"),
+    )
+
+
+@router.get(
+    "/check/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    response_class=Response,
+)
+async def check(
+    token: str = Depends(oauth2_scheme),
+    token_store: TokenStore = Depends(get_token_store),
+) -> Response:
+    """Target of reverse proxy ``auth_request`` subrequests: identity is
+    returned in headers and the user row is only loaded for tokens issued
+    without a role claim or before the role of the user changed.
+
+    nginx turns any answer but 2xx, 401 and 403 into a 500, so every
+    rejected token is answered with 401.
+    """
+    try:
+        token_payload = await get_token_payload(token, token_store)
+        email = validate_access_token_payload(token_payload)
+        user_id, role = token_payload.get("id"), token_payload.get("role")
+        if role is None or not await has_current_role(
+            token_payload, token_store
+        ):
+            if (user := await get_read_only_user_by_email(email)) is None:
+                raise INVALID_TOKEN_CREDENTIAL_EXCEPTION
+            user_id, role = user.id, user.role
+    except HTTPException as exc:
+        if exc.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=exc.detail,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    max_age = min(
+        AuthCheckSettings.cache_seconds,
+        max(token_payload["exp"] - wall_clock.now(), 0),
+    )
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={
+            AuthCheckSettings.USER_ID_HEADER: str(user_id),
+            AuthCheckSettings.USER_ROLE_HEADER: role,
+            "Cache-Control": f"private, max-age={max_age}",
+            "Vary": "Authorization",
+        },
+    )
+
+
+@router.post(
+    "/introspect/",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(check_introspection_secret)],
+    response_model=IntrospectionResponseSchema,
+    response_model_exclude_none=True,
+)
+async def introspect(
+    introspection_data: IntrospectionRequestSchema,
+    token_store: TokenStore = Depends(get_token_store),
+) -> IntrospectionResponseSchema:
+    """RFC 7662 style introspection of a batch of tokens. Inactive tokens
+    carry no claims, the reason they are inactive is not disclosed."""
+    payloads = await get_token_payloads(introspection_data.tokens, token_store)
+    return IntrospectionResponseSchema(
+        tokens=[introspection_result(payload) for payload in payloads]
+    )
@@ -1,3 +1,4 @@
+from src.api.v1.users.utils.user_cache import user_cache
 from src.db.models import User
 from src.db.session import s
 
@@ -9,6 +10,7 @@ async def increase_balance(user: User, amount: int) -> None:
     except Exception as e:
         await s.user_db.rollback()
         raise e
+    await user_cache.invalidate(user.id)
 
 
 async def decrease_balance(user: User, amount: int) -> None:
@@ -18,3 +20,4 @@ async def decrease_balance(user: User, amount: int) -> None:
     except Exception as e:
         await s.user_db.rollback()
         raise e
+    await user_cache.invalidate(user.id)
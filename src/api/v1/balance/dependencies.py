@@ -1,11 +1,13 @@
 from fastapi import Depends
 
 from src.api.exceptions import NEGATIVE_BALANCE_ERROR
-from src.api.v1.users.dependencies import get_current_user
-from src.db.models import User
+from src.api.v1.users.dependencies import get_current_user_fresh
+from src.api.v1.users.utils.principal import AuthPrincipal
 
 
-def get_user_balance(user: User = Depends(get_current_user)) -> int:
+def get_user_balance(
+    user: AuthPrincipal = Depends(get_current_user_fresh),
+) -> int:
     if user.balance < 0:
         raise NEGATIVE_BALANCE_ERROR
 
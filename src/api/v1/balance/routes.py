@@ -11,8 +11,8 @@ from src.api.exceptions import (
 from src.api.v1.balance.crud import decrease_balance, increase_balance
 from src.api.v1.balance.dependencies import get_user_balance
 from src.api.v1.balance.models.balance import AmountSchema, UserBalanceSchema
-from src.api.v1.users.dependencies import get_current_user
-from src.db.models import User
+from src.api.v1.users.dependencies import get_current_user_fresh
+from src.api.v1.users.utils.principal import AuthPrincipal
 
 log = logging.getLogger(__name__)
 
@@ -32,7 +32,7 @@ router = APIRouter(prefix="/balance", tags=["balance"])
 )
 def get_balance(
     balance: int = Depends(get_user_balance),
-    user: User = Depends(get_current_user),
+    user: AuthPrincipal = Depends(get_current_user_fresh),
 ) -> UserBalanceSchema:
     return UserBalanceSchema(user_id=user.id, balance=balance)
 
@@ -47,9 +47,9 @@ def get_balance(
 )
 async def deposit_balance(
     amount_schema: AmountSchema,
-    user: User = Depends(get_current_user),
+    principal: AuthPrincipal = Depends(get_current_user_fresh),
 ) -> UserBalanceSchema:
-
+    user = await principal.load()
     await increase_balance(user, amount_schema.amount)
     log.info(f"User {user.email} deposit successfully")
     return UserBalanceSchema(user_id=user.id, balance=user.balance)
@@ -68,8 +68,9 @@ async def deposit_balance(
 )
 async def withdraw_balance(
     amount_schema: AmountSchema,
-    user: User = Depends(get_current_user),
+    principal: AuthPrincipal = Depends(get_current_user_fresh),
 ) -> UserBalanceSchema:
+    user = await principal.load()
     if user.balance < amount_schema.amount:
         raise INSUFFICIENT_BALANCE_ERROR
 
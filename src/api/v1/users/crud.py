@@ -1,9 +1,25 @@
-from sqlalchemy import select
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.orm.attributes import set_committed_value
 
 from src.api.v1.users.models.user import UserCreationSchema
+from src.api.v1.users.utils.principal import PRINCIPAL_FIELDS, AuthPrincipal
+from src.api.v1.users.utils.user_cache import user_cache
 from src.db.models import User
 from src.db.session import s
 
+SELECT_PRINCIPAL = select(
+    *(User.__table__.c[field] for field in PRINCIPAL_FIELDS)
+)
+
+# Statements run on every connection warmed up at startup.
+WARM_UP_QUERIES = (
+    select(User).filter(User.email == ""),
+    select(User).filter(User.id == 0),
+    SELECT_PRINCIPAL.where(User.email == ""),
+)
+
 
 async def create_user(user_data: UserCreationSchema) -> User:
     db_user = User(**user_data.model_dump())
@@ -13,60 +29,109 @@ async def create_user(user_data: UserCreationSchema) -> User:
     return db_user
 
 
-async def activate_user(user: User) -> None:
-    user.is_active = True
+async def _update_user(user: User, **values: Any) -> User:
+    """Apply ``values`` with one Core ``UPDATE ... RETURNING`` statement and
+    load the returned row into ``user`` as its committed state, instead of
+    flushing attribute changes and refreshing the instance afterwards."""
+    users = User.__table__
+    query = (
+        update(users)
+        .where(users.c.id == user.id)
+        .values(**values)
+        .returning(*users.c)
+    )
+    row = (await s.user_db.execute(query)).one()
     await s.user_db.commit()
-    await s.user_db.refresh(user)
+    await user_cache.invalidate(user.id)
+
+    for column, value in row._asdict().items():
+        set_committed_value(user, column, value)
+    return user
+
+
+async def activate_user(user: User) -> None:
+    await _update_user(user, is_active=True)
 
 
 async def deactivate_my_user(user: User) -> None:
-    user.is_active = False
-    await s.user_db.commit()
-    await s.user_db.refresh(user)
+    await _update_user(user, is_active=False)
 
 
 async def delete_my_user(user: User) -> None:
-    user.is_active = False
-    user.is_deleted = True
-    user.email = None
-    user.first_name = None
-    user.last_name = None
-    await s.user_db.commit()
-    await s.user_db.refresh(user)
+    await _update_user(
+        user,
+        is_active=False,
+        is_deleted=True,
+        email=None,
+        first_name=None,
+        last_name=None,
+    )
 
 
 async def change_user_password(user: User, new_password: str) -> None:
-    user.password = new_password
-    await s.user_db.commit()
-    await s.user_db.refresh(user)
+    await _update_user(user, password=new_password)
 
 
-async def get_user_by_email(email: str) -> User | None:
+async def change_user_role(user: User, role: str) -> None:
+    await _update_user(user, role=role, role_version=User.role_version + 1)
+
+
+async def get_user_by_email(
+    email: str, read_only: bool = False
+) -> User | None:
+    """``read_only`` lookups may be served by a lagging read replica, the
+    returned user must not be modified."""
     query = select(User).filter(User.email == email)
-    return await s.user_db.scalar(query)
+    return await (s.read_db if read_only else s.user_db).scalar(query)
+
+
+async def get_principal_by_email(
+    email: str, read_only: bool = False
+) -> AuthPrincipal | None:
+    """``get_user_by_email`` selecting the principal columns only, without
+    loading an ORM object into the session."""
+    query = SELECT_PRINCIPAL.where(User.email == email)
+    session = s.read_db if read_only else s.user_db
+    row = (await session.execute(query)).one_or_none()
+    return None if row is None else AuthPrincipal(*row)
+
+
+async def get_cached_user(user_id: int, email: str) -> AuthPrincipal | None:
+    """``get_principal_by_email`` served from the user cache when possible.
 
+    Code reading the password or relying on an up to date balance must
+    load the user with ``get_user_by_email`` instead.
+    """
+    values, version = await user_cache.get(user_id, email)
+    if values is not None:
+        return AuthPrincipal.from_cached_values(values)
 
-async def get_user_by_id(user_id: int) -> User | None:
-    return await s.user_db.get(User, user_id)
+    principal = await get_principal_by_email(email)
+    if principal is not None and principal.id == user_id:
+        await user_cache.set(user_id, version, principal.cached_values())
+    return principal
+
+
+async def get_user_by_id(user_id: int, read_only: bool = False) -> User | None:
+    return await (s.read_db if read_only else s.user_db).get(User, user_id)
 
 
 async def edit_user(user: User, edited_data: dict[str, str]) -> User:
-    for field, value in edited_data.items():
-        if hasattr(user, field):
-            setattr(user, field, value)
+    columns = User.__table__.columns.keys()
+    values = {
+        field: value
+        for field, value in edited_data.items()
+        if field in columns
+    }
+    if not values:
+        return user
 
-    await s.user_db.commit()
-    await s.user_db.refresh(user)
-    return user
+    return await _update_user(user, **values)
 
 
 async def block_my_user(user: User) -> None:
-    user.is_blocked = True
-    await s.user_db.commit()
-    await s.user_db.refresh(user)
+    await _update_user(user, is_blocked=True)
 
 
 async def unblock_my_user(user: User) -> None:
-    user.is_blocked = False
-    await s.user_db.commit()
-    await s.user_db.refresh(user)
+    await _update_user(user, is_blocked=False)
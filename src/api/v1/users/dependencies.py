@@ -1,64 +1,348 @@
-import json
-from typing import Any, AsyncGenerator
+from typing import Any
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 
+import jwt
 from redis.asyncio import Redis
 
 from src.api.exceptions import (
     CREDENTIAL_EXCEPTIONS,
+    EXPIRED_TOKEN_EXCEPTION,
     INVALID_TOKEN_CREDENTIAL_EXCEPTION,
     INVALID_TOKEN_EXCEPTION,
     INVALID_TOKEN_TYPE_EXCEPTION,
     REVOKED_TOKEN_ERROR,
+    TOO_MANY_REQUESTS_EXCEPTION,
+    UNABLE_DECODE_JWT_EXCEPTION,
+)
+from src.api.v1.users import fast_crud
+from src.api.v1.users.crud import (
+    get_cached_user,
+    get_principal_by_email,
+    get_user_by_email,
+)
+from src.api.v1.users.models.user import UserCreationSchema, UserLoginSchema
+from src.api.v1.users.utils.my_jwt import (
+    token_digest,
+    validate_token_type,
+    verify_jwt,
+)
+from src.api.v1.users.utils.permissions import (
+    ROLE_PERMISSIONS_VERSION,
+    Permission,
+    role_permissions,
+)
+from src.api.v1.users.utils.principal import AuthPrincipal
+from src.api.v1.users.utils.rate_limit import (
+    RateLimiter,
+    get_redis_rate_limiter,
+    memory_rate_limiter,
+    rate_limit_key,
+)
+from src.api.v1.users.utils.token_cache import token_payload_cache
+from src.api.v1.users.utils.token_store import (
+    TokenStore,
+    get_redis_token_store,
+    memory_token_store,
+)
+from src.db.redis_pool import get_redis
+from src.settings import (
+    DbSettings,
+    JWTSettings,
+    RateLimit,
+    RateLimitSettings,
+    TokenStoreSettings,
 )
-from src.api.v1.users.crud import get_user_by_email
-from src.api.v1.users.utils.my_jwt import validate_token_type
-from src.db.models import User
-from src.settings import JWTSettings, RedisSettings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login/")
 
 
-async def get_redis_client() -> AsyncGenerator[Redis, None]:
-    redis_client = Redis(host=RedisSettings.host, port=RedisSettings.port)
-    yield redis_client
-    await redis_client.aclose()
+async def get_redis_client() -> Redis:
+    return get_redis()
+
+
+async def get_token_store(
+    redis: Redis = Depends(get_redis_client),
+) -> TokenStore:
+    if TokenStoreSettings.backend == TokenStoreSettings.MEMORY_BACKEND:
+        return memory_token_store
+    return get_redis_token_store(redis)
+
+
+async def get_rate_limiter(
+    redis: Redis = Depends(get_redis_client),
+) -> RateLimiter:
+    if RateLimitSettings.backend == RateLimitSettings.MEMORY_BACKEND:
+        return memory_rate_limiter
+    return get_redis_rate_limiter(redis)
+
+
+def get_client_ip(request: Request) -> str:
+    if RateLimitSettings.trust_forwarded_for and (
+        forwarded_for := request.headers.get("X-Forwarded-For")
+    ):
+        return forwarded_for.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce_rate_limits(
+    rate_limiter: RateLimiter, *limits: tuple[str, RateLimit]
+) -> None:
+    if not RateLimitSettings.enabled:
+        return
+
+    for key, rate_limit in limits:
+        if retry_after := await rate_limiter.hit(key, rate_limit):
+            raise HTTPException(
+                status_code=TOO_MANY_REQUESTS_EXCEPTION.status_code,
+                detail=TOO_MANY_REQUESTS_EXCEPTION.detail,
+                headers={"Retry-After": str(retry_after)},
+            )
+
+
+async def login_rate_limit(
+    request: Request,
+    payload: UserLoginSchema,
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> None:
+    """Throttle logins per client IP and per target email before the user
+    is looked up or any password is verified."""
+    await enforce_rate_limits(
+        rate_limiter,
+        (
+            rate_limit_key("login_ip", get_client_ip(request)),
+            RateLimitSettings.login_ip,
+        ),
+        (
+            rate_limit_key("login_email", payload.email.lower()),
+            RateLimitSettings.login_email,
+        ),
+    )
+
+
+async def signup_rate_limit(
+    request: Request,
+    payload: UserCreationSchema,
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> None:
+    await enforce_rate_limits(
+        rate_limiter,
+        (
+            rate_limit_key("signup_ip", get_client_ip(request)),
+            RateLimitSettings.signup_ip,
+        ),
+        (
+            rate_limit_key("signup_email", payload.email.lower()),
+            RateLimitSettings.signup_email,
+        ),
+    )
 
 
 async def get_token_payload(
     token: str = Depends(oauth2_scheme),
-    redis: Redis = Depends(get_redis_client),
+    token_store: TokenStore = Depends(get_token_store),
 ) -> dict[str, Any]:
-    if (payload := await redis.get(token)) is None:
+    digest = token_digest(token)
+    if (payload := token_payload_cache.get(digest)) is not None:
+        return payload
+
+    if JWTSettings.VERIFICATION_MODE == JWTSettings.LOCAL_VERIFICATION_MODE:
+        payload = await _get_local_token_payload(token, token_store)
+    elif (payload := await token_store.get(token)) is None:
         raise CREDENTIAL_EXCEPTIONS
-    return json.loads(payload)
 
+    token_payload_cache.set(digest, payload)
+    return payload
 
-async def get_current_user(
-    token_payload: dict[str, Any] = Depends(get_token_payload),
-) -> User:
+
+async def get_token_payloads(
+    tokens: list[str], token_store: TokenStore
+) -> list[dict[str, Any] | None]:
+    """Batch counterpart of ``get_token_payload``: the payload of every
+    active token, ``None`` for the rest. Cache misses are resolved with one
+    token store round trip per lookup kind."""
+    digests = [token_digest(token) for token in tokens]
+    payloads = [token_payload_cache.get(digest) for digest in digests]
+    misses = [
+        index for index, payload in enumerate(payloads) if payload is None
+    ]
+
+    lookups = misses
+    if JWTSettings.VERIFICATION_MODE == JWTSettings.LOCAL_VERIFICATION_MODE:
+        lookups, verified = [], []
+        for index in misses:
+            try:
+                payload = verify_jwt(tokens[index])
+            except jwt.InvalidTokenError:
+                continue
+            if validate_token_type(payload, JWTSettings.ACCESS_TOKEN_TYPE):
+                verified.append((index, payload))
+            else:
+                lookups.append(index)
+
+        revoked = await token_store.are_revoked(
+            [payload for _, payload in verified]
+        )
+        for (index, payload), is_revoked in zip(verified, revoked):
+            if not is_revoked:
+                payloads[index] = payload
+
+    stored = await token_store.get_many([tokens[index] for index in lookups])
+    for index, payload in zip(lookups, stored):
+        payloads[index] = payload
+
+    for index in misses:
+        if payloads[index] is not None:
+            token_payload_cache.set(digests[index], payloads[index])
+    return payloads
+
+
+def _verify_token(token: str) -> dict[str, Any]:
+    try:
+        return verify_jwt(token)
+    except jwt.ExpiredSignatureError:
+        raise EXPIRED_TOKEN_EXCEPTION
+    except jwt.InvalidTokenError:
+        raise UNABLE_DECODE_JWT_EXCEPTION
+
+
+async def _get_local_token_payload(
+    token: str, token_store: TokenStore
+) -> dict[str, Any]:
+    """Access tokens are verified in process, Redis is only asked whether
+    the token was revoked. Refresh tokens are still looked up in the token
+    store."""
+    payload = _verify_token(token)
+    if not validate_token_type(payload, JWTSettings.ACCESS_TOKEN_TYPE):
+        if (stored_payload := await token_store.get(token)) is None:
+            raise CREDENTIAL_EXCEPTIONS
+        return stored_payload
+
+    if await token_store.is_revoked(payload):
+        raise REVOKED_TOKEN_ERROR
+
+    return payload
+
+
+def validate_access_token_payload(token_payload: dict[str, Any]) -> str:
+    """Check the claims of an access token and return its subject."""
+    if not validate_token_type(token_payload, JWTSettings.ACCESS_TOKEN_TYPE):
+        raise INVALID_TOKEN_TYPE_EXCEPTION
     if (email := token_payload.get("sub")) is None:
         raise INVALID_TOKEN_EXCEPTION
 
     if token_payload.get("token_revoked") is True:
         raise REVOKED_TOKEN_ERROR
 
+    return email
+
+
+async def get_cached_user_by_claims(
+    payload: dict[str, Any],
+) -> AuthPrincipal | None:
+    if (user_id := payload.get("id")) is None:
+        return await get_principal_by_email(payload["sub"])
+    return await get_cached_user(user_id, payload["sub"])
+
+
+async def get_current_user(
+    token_payload: dict[str, Any] = Depends(get_token_payload),
+) -> AuthPrincipal:
+    """The principal may come from the user cache, routes modifying the
+    user ``load`` it."""
+    validate_access_token_payload(token_payload)
+    if (user := await get_cached_user_by_claims(token_payload)) is None:
+        raise INVALID_TOKEN_CREDENTIAL_EXCEPTION
+
+    return user
+
+
+async def get_current_user_fresh(
+    token_payload: dict[str, Any] = Depends(get_token_payload),
+) -> AuthPrincipal:
+    """``get_current_user`` bypassing the user cache, for routes reading
+    the password hash or the balance. The ORM user is loaded into the
+    session, so ``load`` does not query it again."""
+    email = validate_access_token_payload(token_payload)
     if (user := await get_user_by_email(email=email)) is None:
         raise INVALID_TOKEN_CREDENTIAL_EXCEPTION
 
+    return AuthPrincipal.from_user(user)
+
+
+async def get_read_only_user_by_email(email: str) -> AuthPrincipal | None:
+    if DbSettings.fast_path:
+        return await fast_crud.get_user_by_email(email)
+    return await get_principal_by_email(email, read_only=True)
+
+
+async def get_current_user_read_only(
+    token_payload: dict[str, Any] = Depends(get_token_payload),
+) -> AuthPrincipal:
+    """``get_current_user`` for routes that never modify the user, the
+    user may be loaded from a read replica or by the asyncpg fast path."""
+    email = validate_access_token_payload(token_payload)
+    if (user := await get_read_only_user_by_email(email)) is None:
+        raise INVALID_TOKEN_CREDENTIAL_EXCEPTION
+
     return user
 
 
+async def has_current_role(
+    token_payload: dict[str, Any], token_store: TokenStore
+) -> bool:
+    """Whether the role claims of the access token were issued after the
+    last role change of the user."""
+    if (user_id := token_payload.get("id")) is None:
+        return False
+    role_version = await token_store.get_role_version(user_id)
+    return token_payload.get("rv") == role_version
+
+
+async def get_token_permissions(
+    token_payload: dict[str, Any] = Depends(get_token_payload),
+    token_store: TokenStore = Depends(get_token_store),
+) -> Permission:
+    """Permissions granted by the claims of the access token. Tokens issued
+    without them, before ``ROLE_PERMISSIONS`` changed or before the role of
+    the user changed are re-checked against the role on the primary."""
+    email = validate_access_token_payload(token_payload)
+    mask = token_payload.get("perm")
+    if (
+        mask is not None
+        and token_payload.get("pv") == ROLE_PERMISSIONS_VERSION
+        and await has_current_role(token_payload, token_store)
+    ):
+        return Permission(mask)
+
+    if (user := await get_principal_by_email(email)) is None:
+        raise INVALID_TOKEN_CREDENTIAL_EXCEPTION
+    return role_permissions(user.role)
+
+
+async def get_refresh_token_payload(
+    token: str = Depends(oauth2_scheme),
+) -> dict[str, Any]:
+    """Refresh tokens are only verified here, whether they are still
+    usable is decided atomically when they are rotated."""
+    payload = _verify_token(token)
+    if not validate_token_type(payload, JWTSettings.REFRESH_TOKEN_TYPE):
+        raise INVALID_TOKEN_TYPE_EXCEPTION
+    if not payload.get("sid") or payload.get("id") is None:
+        raise INVALID_TOKEN_EXCEPTION
+
+    return payload
+
+
 async def get_user_from_refresh_token(
-    payload: dict[str, Any] = Depends(get_token_payload),
-) -> User | None:
+    payload: dict[str, Any] = Depends(get_refresh_token_payload),
+) -> AuthPrincipal:
     if not validate_token_type(payload, JWTSettings.REFRESH_TOKEN_TYPE):
         raise INVALID_TOKEN_TYPE_EXCEPTION
-    if (email := payload.get("sub")) is None:
+    if payload.get("sub") is None:
         raise INVALID_TOKEN_EXCEPTION
-    if (user := await get_user_by_email(email)) is None:
+    if (user := await get_cached_user_by_claims(payload)) is None:
         raise INVALID_TOKEN_CREDENTIAL_EXCEPTION
 
     return user
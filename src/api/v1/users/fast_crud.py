@@ -0,0 +1,26 @@
+from src.api.v1.users.utils.principal import PRINCIPAL_FIELDS, AuthPrincipal
+from src.db.fast_path import FastPathPool
+
+SELECT_USER = f"SELECT {', '.join(PRINCIPAL_FIELDS)} FROM users"
+
+user_fast_path = FastPathPool(
+    {
+        "user_by_email": f"{SELECT_USER} WHERE email = $1",
+        "user_by_id": f"{SELECT_USER} WHERE id = $1",
+        "balance_by_id": "SELECT balance FROM users WHERE id = $1",
+    }
+)
+
+
+async def get_user_by_email(email: str) -> AuthPrincipal | None:
+    row = await user_fast_path.fetchrow("user_by_email", email)
+    return None if row is None else AuthPrincipal(*row)
+
+
+async def get_user_by_id(user_id: int) -> AuthPrincipal | None:
+    row = await user_fast_path.fetchrow("user_by_id", user_id)
+    return None if row is None else AuthPrincipal(*row)
+
+
+async def get_balance_by_id(user_id: int) -> int | None:
+    return await user_fast_path.fetchval("balance_by_id", user_id)
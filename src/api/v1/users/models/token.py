@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, Field
 
 
 class TokenSchema(BaseModel):
@@ -13,3 +15,12 @@ class AccessTokenSchema(BaseModel):
 
 class RevokedAccessTokenSchema(AccessTokenSchema):
     revoked: bool = True
+
+
+class SessionSchema(BaseModel):
+    session_id: str
+    expires_at: datetime = Field(description="The date the session expires.")
+
+
+class SessionsResponseSchema(BaseModel):
+    sessions: list[SessionSchema]
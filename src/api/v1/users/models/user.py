@@ -4,6 +4,7 @@ from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 from pydantic_core.core_schema import ValidationInfo
 
 from src.api.v1.users.utils.password import validate_password
+from src.api.v1.users.utils.permissions import ROLE_PERMISSIONS
 
 
 class BaseUserSchema(BaseModel):
@@ -95,6 +96,25 @@ class BlockUserSchema(BaseModel):
     )
 
 
+class ChangeRoleSchema(BaseModel):
+    role: str = Field(description="New role of the user.")
+
+    @field_validator("role")
+    def role_validator(cls, role: str) -> str:
+        if role not in ROLE_PERMISSIONS:
+            raise ValueError(
+                f"Role must be one of: {', '.join(ROLE_PERMISSIONS)}"
+            )
+        return role
+
+
+class UserRoleSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    role: str
+
+
 class DeactivateUserSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,19 +1,20 @@
-import asyncio
-import json
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import APIRouter, Depends
 
-from redis.asyncio import Redis
 from starlette import status
 
 from src.api.exceptions import (
     BLOCKED_USER_EXCEPTION,
     CREDENTIAL_EXCEPTIONS,
     NOT_ACTIVE_USER_EXCEPTION,
+    REFRESH_TOKEN_REUSED_EXCEPTION,
     REPEAT_EMAIL_EXCEPTION,
+    REVOKED_TOKEN_ERROR,
+    SERVICE_OVERLOADED_EXCEPTION,
+    TOO_MANY_REQUESTS_EXCEPTION,
 )
 from src.api.v1.users.crud import (
     activate_user,
@@ -26,13 +27,20 @@ from src.api.v1.users.crud import (
 )
 from src.api.v1.users.dependencies import (
     get_current_user,
-    get_redis_client,
+    get_current_user_fresh,
+    get_current_user_read_only,
+    get_refresh_token_payload,
     get_token_payload,
+    get_token_store,
     get_user_from_refresh_token,
+    login_rate_limit,
+    oauth2_scheme,
+    signup_rate_limit,
 )
 from src.api.v1.users.models.token import (
-    AccessTokenSchema,
     RevokedAccessTokenSchema,
+    SessionSchema,
+    SessionsResponseSchema,
     TokenSchema,
 )
 from src.api.v1.users.models.user import (
@@ -44,13 +52,25 @@ from src.api.v1.users.models.user import (
     UserResponseSchema,
     UserSchema,
 )
+from src.api.v1.users.utils.admission import (
+    change_password_admission,
+    login_admission,
+    signup_admission,
+)
 from src.api.v1.users.utils.my_jwt import (
     create_access_token,
     create_refresh_token,
+    create_session_id,
     revoke_jwt,
 )
-from src.api.v1.users.utils.password import hash_password, verify_password
-from src.db.models import User
+from src.api.v1.users.utils.password import (
+    async_hash_password,
+    async_verify_and_update_password,
+    async_verify_password,
+)
+from src.api.v1.users.utils.principal import AuthPrincipal
+from src.api.v1.users.utils.token_store import RotationResult, TokenStore
+from src.settings import JWTSettings
 
 log = logging.getLogger(__name__)
 
@@ -65,7 +85,11 @@ router = APIRouter(prefix="/users", tags=["users"])
         status.HTTP_422_UNPROCESSABLE_ENTITY: {
             "description": REPEAT_EMAIL_EXCEPTION.detail
         },
+        status.HTTP_429_TOO_MANY_REQUESTS: {
+            "description": TOO_MANY_REQUESTS_EXCEPTION.detail
+        },
     },
+    dependencies=[Depends(signup_rate_limit)],
 )
 async def signup(payload: UserCreationSchema) -> UserResponseSchema:
     if (user := await get_user_by_email(email=payload.email)) is not None:
@@ -75,7 +99,8 @@ async def signup(payload: UserCreationSchema) -> UserResponseSchema:
         await activate_user(user)
         return UserResponseSchema.model_validate(user)
 
-    payload.password = hash_password(payload.password)
+    async with signup_admission.admit():
+        payload.password = await async_hash_password(payload.password)
     user = await create_user(user_data=payload)
     log.info(f"User {user.email} created successfully")
     return UserResponseSchema.model_validate(user)
@@ -89,14 +114,28 @@ async def signup(payload: UserCreationSchema) -> UserResponseSchema:
         status.HTTP_401_UNAUTHORIZED: {
             "description": "Invalid credentials or user is not active"
         },
+        status.HTTP_429_TOO_MANY_REQUESTS: {
+            "description": TOO_MANY_REQUESTS_EXCEPTION.detail
+        },
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "description": SERVICE_OVERLOADED_EXCEPTION.detail
+        },
     },
+    dependencies=[Depends(login_rate_limit)],
 )
 async def login(
     payload: UserLoginSchema,
-    redis_client: Redis = Depends(get_redis_client),
+    token_store: TokenStore = Depends(get_token_store),
 ) -> TokenSchema:
     user = await get_user_by_email(email=payload.email)
-    if user is None or not verify_password(payload.password, user.password):
+    if user is None:
+        raise CREDENTIAL_EXCEPTIONS
+
+    async with login_admission.admit():
+        verified, new_password = await async_verify_and_update_password(
+            payload.password, user.password
+        )
+    if not verified:
         raise CREDENTIAL_EXCEPTIONS
 
     if not user.is_active:
@@ -105,22 +144,24 @@ async def login(
     if user.is_blocked:
         raise BLOCKED_USER_EXCEPTION
 
-    access_token, access_payload = create_access_token(user)
-    refresh_token, refresh_payload = create_refresh_token(user)
-
-    now = int(datetime.utcnow().timestamp())
-    await asyncio.gather(
-        redis_client.set(
-            name=access_token,
-            value=json.dumps(access_payload),
-            ex=int(access_payload["exp"]) - now,
-        ),
-        redis_client.set(
-            name=refresh_token,
-            value=json.dumps(refresh_payload),
-            ex=int(refresh_payload["exp"]) - now,
-        ),
+    if new_password is not None:
+        await change_user_password(user, new_password)
+        log.info(f"Password hash of user {user.email} upgraded")
+
+    session_id = create_session_id()
+    generation = await token_store.get_generation(user.id)
+    access_token, access_payload = create_access_token(
+        user, session_id, generation
     )
+    refresh_token, refresh_payload = create_refresh_token(
+        user, session_id, generation
+    )
+
+    tokens = [(refresh_token, refresh_payload)]
+    if JWTSettings.VERIFICATION_MODE == JWTSettings.REDIS_VERIFICATION_MODE:
+        tokens.append((access_token, access_payload))
+
+    await token_store.save(*tokens)
     log.info(f"User {user.email} login successfully")
 
     return TokenSchema(access_token=access_token, refresh_token=refresh_token)
@@ -132,8 +173,12 @@ async def login(
     responses={status.HTTP_200_OK: {"model": RevokedAccessTokenSchema}},
 )
 async def logout(
+    token: str = Depends(oauth2_scheme),
     payload: dict[str, Any] = Depends(get_token_payload),
+    token_store: TokenStore = Depends(get_token_store),
 ) -> RevokedAccessTokenSchema:
+    await token_store.revoke(token, payload)
+
     revoked_token = revoke_jwt(payload)
     log.info("Token revoked successfully")
 
@@ -143,13 +188,38 @@ async def logout(
 @router.post(
     "/refresh/",
     status_code=status.HTTP_201_CREATED,
-    responses={status.HTTP_201_CREATED: {"model": AccessTokenSchema}},
+    responses={
+        status.HTTP_201_CREATED: {"model": TokenSchema},
+        status.HTTP_403_FORBIDDEN: {
+            "description": REFRESH_TOKEN_REUSED_EXCEPTION.detail
+        },
+    },
 )
 async def refresh_access_token(
-    user: User = Depends(get_user_from_refresh_token),
-) -> AccessTokenSchema:
-    access_token, _ = create_access_token(user)
-    return AccessTokenSchema(access_token=access_token)
+    token: str = Depends(oauth2_scheme),
+    payload: dict[str, Any] = Depends(get_refresh_token_payload),
+    user: AuthPrincipal = Depends(get_user_from_refresh_token),
+    token_store: TokenStore = Depends(get_token_store),
+) -> TokenSchema:
+    session_id, generation = payload["sid"], payload.get("gen", 0)
+    access = create_access_token(user, session_id, generation)
+    refresh = create_refresh_token(user, session_id, generation)
+
+    store_access = (
+        JWTSettings.VERIFICATION_MODE == JWTSettings.REDIS_VERIFICATION_MODE
+    )
+    result = await token_store.rotate(
+        token, payload, refresh, access if store_access else None
+    )
+    if result is RotationResult.REUSED:
+        log.warning(f"Refresh token reuse detected for session {session_id}")
+        raise REFRESH_TOKEN_REUSED_EXCEPTION
+    if result is RotationResult.FAMILY_REVOKED:
+        raise REVOKED_TOKEN_ERROR
+    if result is not RotationResult.ROTATED:
+        raise CREDENTIAL_EXCEPTIONS
+
+    return TokenSchema(access_token=access[0], refresh_token=refresh[0])
 
 
 @router.post(
@@ -158,8 +228,9 @@ async def refresh_access_token(
     responses={status.HTTP_200_OK: {"model": DeactivateUserSchema}},
 )
 async def deactivate_user(
-    user: User = Depends(get_current_user),
+    principal: AuthPrincipal = Depends(get_current_user),
 ) -> DeactivateUserSchema:
+    user = await principal.load()
     await deactivate_my_user(user)
     log.info(f"User {user.email} deactivated successfully")
 
@@ -172,9 +243,12 @@ async def deactivate_user(
     responses={status.HTTP_200_OK: {"model": DeleteUserSchema}},
 )
 async def delete_user(
-    user: User = Depends(get_current_user),
+    principal: AuthPrincipal = Depends(get_current_user),
+    token_store: TokenStore = Depends(get_token_store),
 ) -> DeleteUserSchema:
+    user = await principal.load()
     await delete_my_user(user)
+    await token_store.revoke_all(user.id)
     log.info(f"User {user.email} deleted successfully")
 
     return DeleteUserSchema.model_validate(user)
@@ -186,11 +260,32 @@ async def delete_user(
     responses={status.HTTP_200_OK: {"model": UserResponseSchema}},
 )
 async def get_user(
-    user: User = Depends(get_current_user),
+    user: AuthPrincipal = Depends(get_current_user_read_only),
 ) -> UserResponseSchema:
     return UserResponseSchema.model_validate(user)
 
 
+@router.get(
+    path="/sessions/",
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_200_OK: {"model": SessionsResponseSchema}},
+)
+async def get_sessions(
+    user: AuthPrincipal = Depends(get_current_user_read_only),
+    token_store: TokenStore = Depends(get_token_store),
+) -> SessionsResponseSchema:
+    sessions = await token_store.get_sessions(user.id)
+    return SessionsResponseSchema(
+        sessions=[
+            SessionSchema(
+                session_id=session_id,
+                expires_at=datetime.fromtimestamp(expires_at, timezone.utc),
+            )
+            for session_id, expires_at in sessions
+        ]
+    )
+
+
 @router.patch(
     "/change-password/",
     status_code=status.HTTP_200_OK,
@@ -203,13 +298,19 @@ async def get_user(
 )
 async def change_password(
     payload: ChangePasswordSchema,
-    user: User = Depends(get_current_user),
+    principal: AuthPrincipal = Depends(get_current_user_fresh),
+    token_store: TokenStore = Depends(get_token_store),
 ) -> UserResponseSchema:
-    if not verify_password(payload.old_password, user.password):
-        raise CREDENTIAL_EXCEPTIONS
-
-    new_password = hash_password(payload.new_password)
+    user = await principal.load()
+    async with change_password_admission.admit():
+        if not await async_verify_password(
+            payload.old_password, user.password
+        ):
+            raise CREDENTIAL_EXCEPTIONS
+
+        new_password = await async_hash_password(payload.new_password)
     await change_user_password(user, new_password)
+    await token_store.revoke_all(user.id)
     return UserResponseSchema.model_validate(user)
 
 
@@ -220,7 +321,8 @@ async def change_password(
 )
 async def update_user(
     payload: UserSchema,
-    user: User = Depends(get_current_user),
+    principal: AuthPrincipal = Depends(get_current_user),
 ) -> UserResponseSchema:
+    user = await principal.load()
     await edit_user(user, payload.model_dump(exclude_none=True))
     return UserResponseSchema.model_validate(user)
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from weakref import WeakKeyDictionary
+
+from src.api.exceptions import SERVICE_OVERLOADED_EXCEPTION
+from src.settings import AdmissionLimits, AdmissionSettings
+
+log = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """Bound the password hashing work a route may have outstanding.
+
+    At most ``max_in_flight`` calls run at once and at most ``max_queued``
+    wait for a slot, each for no longer than ``max_wait_seconds``. Anything
+    beyond that is shed with ``SERVICE_OVERLOADED_EXCEPTION`` (503 with
+    ``Retry-After``) instead of growing the hashing queue.
+    """
+
+    def __init__(self, name: str, limits: AdmissionLimits) -> None:
+        self.name = name
+        self.limits = limits
+        self._semaphores: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = WeakKeyDictionary()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """A semaphore binds to the first loop waiting on it, controllers
+        are created at import time, so every loop gets its own."""
+        loop = asyncio.get_running_loop()
+        if (semaphore := self._semaphores.get(loop)) is None:
+            semaphore = asyncio.Semaphore(self.limits.max_in_flight)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def _reject(self) -> None:
+        self.shed += 1
+        log.warning(f"Admission control shed a {self.name} request")
+        raise SERVICE_OVERLOADED_EXCEPTION
+
+    async def _acquire(self, semaphore: asyncio.Semaphore) -> None:
+        if not semaphore.locked():
+            await semaphore.acquire()
+            return
+
+        if self.queued >= self.limits.max_queued:
+            self._reject()
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(
+                semaphore.acquire(), self.limits.max_wait_seconds
+            )
+        except asyncio.TimeoutError:
+            self._reject()
+        finally:
+            self.queued -= 1
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        semaphore = self._semaphore()
+        await self._acquire(semaphore)
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+login_admission = AdmissionController("login", AdmissionSettings.login)
+signup_admission = AdmissionController("signup", AdmissionSettings.signup)
+change_password_admission = AdmissionController(
+    "change_password", AdmissionSettings.change_password
+)
+
+admission_controllers = (
+    login_admission,
+    signup_admission,
+    change_password_admission,
+)
@@ -0,0 +1,142 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+from functools import cache
+from pathlib import Path
+from typing import Iterable
+
+from src.settings import BreachedPasswordSettings
+
+MAGIC = b"BLOOMSH1"
+HEADER = struct.Struct("<8sQI")
+
+
+def sha1_digest(password: str) -> bytes:
+    return hashlib.sha1(password.encode()).digest()
+
+
+def parse_hash_line(line: str) -> bytes | None:
+    """Read the SHA-1 of a ``HASH`` or ``HASH:COUNT`` line as published by
+    Have I Been Pwned."""
+    sha1_hex = line.strip().partition(":")[0]
+    if len(sha1_hex) != 40:
+        return None
+    try:
+        return bytes.fromhex(sha1_hex)
+    except ValueError:
+        return None
+
+
+def optimal_parameters(
+    expected_items: int, false_positive_rate: float
+) -> tuple[int, int]:
+    num_bits = math.ceil(
+        -max(expected_items, 1)
+        * math.log(false_positive_rate)
+        / math.log(2) ** 2
+    )
+    num_bits = max(-(-num_bits // 8) * 8, 8)
+    num_hashes = max(round(num_bits / max(expected_items, 1) * math.log(2)), 1)
+    return num_bits, num_hashes
+
+
+class BloomFilter:
+    """Bloom filter of SHA-1 digests stored in a read-only memory map, so
+    every worker process shares the same page cache copy.
+
+    Bit positions come from double hashing two 64-bit halves of the digest,
+    which are already uniformly distributed.
+    """
+
+    def __init__(self, bits: mmap.mmap, num_bits: int, num_hashes: int):
+        self._bits = bits
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+
+    @staticmethod
+    def _positions(digest: bytes, num_bits: int, num_hashes: int):
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:16], "little") | 1
+        for i in range(num_hashes):
+            yield (first + i * second) % num_bits + HEADER.size * 8
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self._bits
+        for position in self._positions(
+            digest, self.num_bits, self.num_hashes
+        ):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @classmethod
+    def open(cls, path: str | Path) -> "BloomFilter":
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is not a breached password filter")
+            bits = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, num_bits, num_hashes = HEADER.unpack_from(bits)
+        if magic != MAGIC or len(bits) < HEADER.size + num_bits // 8:
+            bits.close()
+            raise ValueError(f"{path} is not a breached password filter")
+        return cls(bits, num_bits, num_hashes)
+
+    @classmethod
+    def build(
+        cls,
+        path: str | Path,
+        digests: Iterable[bytes],
+        expected_items: int,
+        false_positive_rate: float,
+    ) -> int:
+        """Write a filter sized for ``expected_items`` to ``path`` and
+        return the number of digests added."""
+        num_bits, num_hashes = optimal_parameters(
+            expected_items, false_positive_rate
+        )
+        with open(path, "wb+") as file:
+            file.truncate(HEADER.size + num_bits // 8)
+            with mmap.mmap(file.fileno(), 0) as bits:
+                HEADER.pack_into(bits, 0, MAGIC, num_bits, num_hashes)
+                added = 0
+                for digest in digests:
+                    for position in cls._positions(
+                        digest, num_bits, num_hashes
+                    ):
+                        bits[position >> 3] |= 1 << (position & 7)
+                    added += 1
+                bits.flush()
+        return added
+
+
+@cache
+def get_breached_password_filter() -> BloomFilter | None:
+    """Opened at application startup, so a missing or corrupt filter fails
+    the start instead of every signup."""
+    if not BreachedPasswordSettings.bloom_filter_path:
+        return None
+    return BloomFilter.open(BreachedPasswordSettings.bloom_filter_path)
+
+
+def is_breached_password(password: str) -> bool:
+    if (bloom_filter := get_breached_password_filter()) is None:
+        return False
+    return sha1_digest(password) in bloom_filter
+
+
+def build_breached_password_filter(
+    hashes_path: str | Path,
+    output_path: str | Path,
+    false_positive_rate: float,
+) -> int:
+    with open(hashes_path) as file:
+        expected_items = sum(1 for _ in file)
+
+    with open(hashes_path) as file:
+        digests = filter(None, map(parse_hash_line, file))
+        return BloomFilter.build(
+            output_path, digests, expected_items, false_positive_rate
+        )
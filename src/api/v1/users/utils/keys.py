@@ -0,0 +1,146 @@
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+    Ed25519PublicKey,
+)
+from cryptography.hazmat.primitives.asymmetric.rsa import (
+    RSAPrivateKey,
+    RSAPublicKey,
+)
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from src.settings import SecuritySettings
+
+EDDSA_ALGORITHM = "EdDSA"
+DEFAULT_RSA_ALGORITHM = "RS256"
+
+
+class UnknownKeyError(jwt.InvalidKeyError, jwt.InvalidTokenError):
+    """The ``kid`` header names no key of the ring. It comes from the
+    client, so it is an invalid token rather than a misconfiguration."""
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    kid: str
+    algorithm: str
+    verification_key: Any
+    signing_key: Any = None
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm.startswith("HS")
+
+    def to_jwk(self) -> dict[str, Any]:
+        if isinstance(self.verification_key, RSAPublicKey):
+            jwk = RSAAlgorithm.to_jwk(self.verification_key, as_dict=True)
+        else:
+            jwk = OKPAlgorithm.to_jwk(self.verification_key, as_dict=True)
+
+        return {**jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+
+class KeyRing:
+    """The active signing key plus retired keys still accepted for
+    verification, selected by the ``kid`` token header."""
+
+    def __init__(self, active: JWTKey, retired: list[JWTKey]) -> None:
+        self.active = active
+        self.keys = {key.kid: key for key in retired}
+        self.keys[active.kid] = active
+
+    def get(self, kid: str | None) -> JWTKey:
+        if kid is None:
+            return self.active
+        if (key := self.keys.get(kid)) is None:
+            raise UnknownKeyError(f"Unknown key id {kid}")
+        return key
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        return {
+            "keys": [
+                key.to_jwk()
+                for key in self.keys.values()
+                if not key.is_symmetric
+            ]
+        }
+
+
+def _algorithm_for(public_key: Any) -> str:
+    if isinstance(public_key, Ed25519PublicKey):
+        return EDDSA_ALGORITHM
+    if isinstance(public_key, RSAPublicKey):
+        return DEFAULT_RSA_ALGORITHM
+    raise ValueError(f"Unsupported key type {type(public_key).__name__}")
+
+
+def load_signing_key(kid: str, algorithm: str, path: str) -> JWTKey:
+    private_key = load_pem_private_key(Path(path).read_bytes(), password=None)
+    if not isinstance(private_key, (RSAPrivateKey, Ed25519PrivateKey)):
+        raise ValueError(f"Unsupported key type {type(private_key).__name__}")
+
+    return JWTKey(
+        kid=kid,
+        algorithm=algorithm,
+        signing_key=private_key,
+        verification_key=private_key.public_key(),
+    )
+
+
+def load_verification_key(kid: str, path: str) -> JWTKey:
+    public_key = load_pem_public_key(Path(path).read_bytes())
+    return JWTKey(
+        kid=kid,
+        algorithm=_algorithm_for(public_key),
+        verification_key=public_key,
+    )
+
+
+def parse_retired_keys(value: str) -> list[tuple[str, str]]:
+    """Parse ``kid=path,kid=path`` pairs."""
+    pairs = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        kid, _, path = item.partition("=")
+        pairs.append((kid.strip(), path.strip()))
+    return pairs
+
+
+def create_key_ring() -> KeyRing:
+    algorithm = SecuritySettings.ALGORITHM
+    kid = SecuritySettings.SIGNING_KEY_ID
+
+    if algorithm.startswith("HS"):
+        active = JWTKey(
+            kid=kid,
+            algorithm=algorithm,
+            signing_key=SecuritySettings.SECRET_KEY,
+            verification_key=SecuritySettings.SECRET_KEY,
+        )
+    else:
+        if not SecuritySettings.SIGNING_PRIVATE_KEY_PATH:
+            raise ValueError(f"{algorithm} requires SIGNING_PRIVATE_KEY_PATH")
+        active = load_signing_key(
+            kid, algorithm, SecuritySettings.SIGNING_PRIVATE_KEY_PATH
+        )
+
+    retired = [
+        load_verification_key(retired_kid, path)
+        for retired_kid, path in parse_retired_keys(
+            SecuritySettings.RETIRED_PUBLIC_KEY_PATHS
+        )
+    ]
+    return KeyRing(active, retired)
+
+
+@cache
+def get_key_ring() -> KeyRing:
+    return create_key_ring()
@@ -1,10 +1,195 @@
-from datetime import datetime
+import hashlib
+import hmac
+import time
+from functools import cache
 from typing import Any
+from uuid import uuid4
 
 import jwt
+import orjson
+from jwt.algorithms import get_default_algorithms
+from jwt.utils import base64url_decode, base64url_encode
 
+from src.api.v1.users.utils.keys import (
+    JWTKey,
+    KeyRing,
+    UnknownKeyError,
+    get_key_ring,
+)
+from src.api.v1.users.utils.permissions import (
+    ROLE_PERMISSIONS_VERSION,
+    role_permissions,
+)
+from src.api.v1.users.utils.principal import AuthPrincipal
 from src.db.models import User
-from src.settings import JWTSettings, SecuritySettings
+from src.settings import JWTSettings
+
+HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+class WallClock:
+    """Unix time in whole seconds read from the monotonic clock, re-anchored
+    to the wall clock every ``resync_seconds``."""
+
+    def __init__(self, resync_seconds: float = 60) -> None:
+        self.resync_seconds = resync_seconds
+        self._anchor()
+
+    def _anchor(self) -> None:
+        self._anchored_at = time.monotonic()
+        self._offset = time.time() - self._anchored_at
+
+    def now(self) -> int:
+        monotonic = time.monotonic()
+        if monotonic - self._anchored_at > self.resync_seconds:
+            self._anchor()
+        return int(monotonic + self._offset)
+
+
+wall_clock = WallClock()
+
+
+class PreparedKey:
+    """Key material prepared once for signing and verifying one algorithm.
+
+    HMAC keys are kept as a keyed ``hmac`` object which is copied per
+    token instead of re-deriving the inner and outer pads.
+    """
+
+    def __init__(self, key: JWTKey) -> None:
+        self.kid = key.kid
+        self.algorithm = key.algorithm
+        header = {"alg": key.algorithm, "kid": key.kid, "typ": "JWT"}
+        self.header_segment = base64url_encode(orjson.dumps(header))
+
+        if (digest := HMAC_DIGESTS.get(key.algorithm)) is not None:
+            self._hmac = hmac.new(
+                key.verification_key.encode(), digestmod=digest
+            )
+        else:
+            self._hmac = None
+            self._algorithm = get_default_algorithms()[key.algorithm]
+            self._signing_key = key.signing_key
+            self._verification_key = key.verification_key
+
+    def sign(self, signing_input: bytes) -> bytes:
+        if self._hmac is not None:
+            mac = self._hmac.copy()
+            mac.update(signing_input)
+            return mac.digest()
+        return self._algorithm.sign(signing_input, self._signing_key)
+
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        if self._hmac is not None:
+            return hmac.compare_digest(self.sign(signing_input), signature)
+        return self._algorithm.verify(
+            signing_input, self._verification_key, signature
+        )
+
+
+class JWTSigner:
+    def __init__(self, key: PreparedKey) -> None:
+        self.key = key
+        self._prefix = key.header_segment + b"."
+
+    def encode(self, payload: dict[str, Any]) -> str:
+        signing_input = self._prefix + base64url_encode(orjson.dumps(payload))
+        signature = base64url_encode(self.key.sign(signing_input))
+        return (signing_input + b"." + signature).decode()
+
+
+class JWTVerifier:
+    """Verify compact JWS tokens against the key ring.
+
+    Header segments already seen are mapped straight to their prepared key,
+    so the header is only parsed once per key.
+    """
+
+    MAX_KNOWN_HEADERS = 64
+
+    def __init__(self, key_ring: KeyRing, keys: dict[str, PreparedKey]):
+        self.key_ring = key_ring
+        self.keys = keys
+        self._headers = {key.header_segment: key for key in keys.values()}
+
+    def _resolve_key(self, header_segment: bytes) -> PreparedKey:
+        if (key := self._headers.get(header_segment)) is not None:
+            return key
+
+        try:
+            header = orjson.loads(base64url_decode(header_segment))
+        except (ValueError, orjson.JSONDecodeError):
+            raise jwt.DecodeError("Invalid header")
+        if not isinstance(header, dict):
+            raise jwt.DecodeError("Invalid header")
+
+        kid = header.get("kid", self.key_ring.active.kid)
+        if (key := self.keys.get(kid)) is None:
+            raise UnknownKeyError(f"Unknown key id {kid}")
+        if header.get("alg") != key.algorithm:
+            raise jwt.InvalidAlgorithmError("The specified alg is not allowed")
+
+        if len(self._headers) < self.MAX_KNOWN_HEADERS:
+            self._headers[header_segment] = key
+        return key
+
+    def decode(
+        self,
+        token: str | bytes,
+        verify_exp: bool = True,
+        require: tuple[str, ...] = (),
+    ) -> dict[str, Any]:
+        if isinstance(token, str):
+            token = token.encode()
+        try:
+            signing_input, signature_segment = token.rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".")
+            signature = base64url_decode(signature_segment)
+        except ValueError:
+            raise jwt.DecodeError("Not enough segments")
+
+        key = self._resolve_key(header_segment)
+        if not key.verify(signing_input, signature):
+            raise jwt.InvalidSignatureError("Signature verification failed")
+
+        try:
+            payload = orjson.loads(base64url_decode(payload_segment))
+        except (ValueError, orjson.JSONDecodeError):
+            raise jwt.DecodeError("Invalid payload")
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload")
+
+        for claim in require:
+            if claim not in payload:
+                raise jwt.MissingRequiredClaimError(claim)
+
+        if verify_exp and "exp" in payload:
+            if not isinstance(payload["exp"], int):
+                raise jwt.DecodeError("Expiration Time claim must be integer")
+            if payload["exp"] <= wall_clock.now():
+                raise jwt.ExpiredSignatureError("Signature has expired")
+
+        return payload
+
+
+class JWTEngine:
+    def __init__(self, key_ring: KeyRing) -> None:
+        keys = {kid: PreparedKey(key) for kid, key in key_ring.keys.items()}
+        self.signer = JWTSigner(keys[key_ring.active.kid])
+        self.verifier = JWTVerifier(key_ring, keys)
+
+
+@cache
+def _create_jwt_engine(key_ring: KeyRing) -> JWTEngine:
+    return JWTEngine(key_ring)
+
+
+def get_jwt_engine() -> JWTEngine:
+    return _create_jwt_engine(get_key_ring())
 
 
 def create_jwt(
@@ -13,26 +198,39 @@ def create_jwt(
     expire_time_seconds: int,
 ) -> tuple[str, dict[str, Any]]:
     jwt_payload = {"type": token_type}
-    now = int(datetime.utcnow().timestamp())
-    jwt_payload["iat"] = str(now)
-    jwt_payload["exp"] = str(now + expire_time_seconds)
+    now = wall_clock.now()
+    jwt_payload["iat"] = now
+    jwt_payload["exp"] = now + expire_time_seconds
+    jwt_payload["jti"] = uuid4().hex
 
     jwt_payload.update(token_data)
-    token = jwt.encode(
-        payload=jwt_payload,
-        algorithm=SecuritySettings.ALGORITHM,
-        key=SecuritySettings.SECRET_KEY,
-    )
+    return encode_jwt(jwt_payload), jwt_payload
+
 
-    return token, jwt_payload
+def encode_jwt(payload: dict[str, Any]) -> str:
+    return get_jwt_engine().signer.encode(payload)
 
 
-def create_access_token(user: User) -> tuple[str, dict[str, Any]]:
+def create_session_id() -> str:
+    return uuid4().hex
+
+
+def create_access_token(
+    user: User | AuthPrincipal,
+    session_id: str | None = None,
+    generation: int = 0,
+) -> tuple[str, dict[str, Any]]:
     jwt_payload = {
         "sub": user.email,
         "id": user.id,
         "is_active": user.is_active,
+        "role": user.role,
+        "perm": int(role_permissions(user.role)),
+        "pv": ROLE_PERMISSIONS_VERSION,
+        "rv": user.role_version,
         "token_revoked": False,
+        "sid": session_id,
+        "gen": generation,
     }
     return create_jwt(
         JWTSettings.ACCESS_TOKEN_TYPE,
@@ -41,8 +239,18 @@ def create_access_token(user: User) -> tuple[str, dict[str, Any]]:
     )
 
 
-def create_refresh_token(user: User) -> tuple[str, dict[str, Any]]:
-    jwt_payload = {"sub": user.email, "token_revoked": False}
+def create_refresh_token(
+    user: User | AuthPrincipal,
+    session_id: str | None = None,
+    generation: int = 0,
+) -> tuple[str, dict[str, Any]]:
+    jwt_payload = {
+        "sub": user.email,
+        "id": user.id,
+        "token_revoked": False,
+        "sid": session_id,
+        "gen": generation,
+    }
     return create_jwt(
         JWTSettings.REFRESH_TOKEN_TYPE,
         jwt_payload,
@@ -51,21 +259,54 @@ def create_refresh_token(user: User) -> tuple[str, dict[str, Any]]:
 
 
 def revoke_jwt(payload: dict[str, Any]) -> str:
-    payload["token_revoked"] = True
-    return jwt.encode(
-        payload=payload,
-        algorithm=SecuritySettings.ALGORITHM,
-        key=SecuritySettings.SECRET_KEY,
-    )
+    return encode_jwt({**payload, "token_revoked": True})
 
 
 def decode_jwt(token: bytes) -> dict[str, Any]:
-    return jwt.decode(
-        jwt=token,
-        algorithms=[SecuritySettings.ALGORITHM],
-        key=SecuritySettings.SECRET_KEY,
-        options={"verify_exp": False},
+    return get_jwt_engine().verifier.decode(token, verify_exp=False)
+
+
+def verify_jwt(token: str | bytes) -> dict[str, Any]:
+    """Verify signature, expiry and type of the token locally.
+
+    Raises ``jwt.InvalidTokenError`` subclasses on failure.
+    """
+    payload = get_jwt_engine().verifier.decode(
+        token, require=("exp", "iat", "jti", "type")
     )
+    if payload["type"] not in (
+        JWTSettings.ACCESS_TOKEN_TYPE,
+        JWTSettings.REFRESH_TOKEN_TYPE,
+    ):
+        raise jwt.InvalidTokenError("Unknown token type")
+
+    return payload
+
+
+def peek_jwt(token: str | bytes) -> dict[str, Any]:
+    """Read the claims without verifying the token, only to route lookups
+    of tokens that are verified afterwards."""
+    if isinstance(token, str):
+        token = token.encode()
+    try:
+        payload = orjson.loads(base64url_decode(token.split(b".")[1]))
+    except (IndexError, ValueError, orjson.JSONDecodeError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def get_token_ttl(payload: dict[str, Any]) -> int:
+    return max(int(payload["exp"]) - wall_clock.now(), 1)
+
+
+def token_digest(token: str | bytes) -> str:
+    if isinstance(token, str):
+        token = token.encode()
+    return hashlib.sha256(token).hexdigest()
+
+
+def revoked_token_key(payload: dict[str, Any]) -> str:
+    return f"{JWTSettings.REVOKED_TOKEN_PREFIX}{payload['jti']}"
 
 
 def validate_token_type(payload: dict[str, Any], token_type: str) -> bool:
@@ -1,6 +1,43 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.api.v1.users.utils.breached_passwords import is_breached_password
+from src.settings import PasswordHashSettings
+
+T = TypeVar("T")
+
+
+def create_crypt_context(
+    scheme: str = PasswordHashSettings.scheme,
+    bcrypt_rounds: int = PasswordHashSettings.bcrypt_rounds,
+    argon2_time_cost: int = PasswordHashSettings.argon2_time_cost,
+    argon2_memory_cost: int = PasswordHashSettings.argon2_memory_cost,
+    argon2_parallelism: int = PasswordHashSettings.argon2_parallelism,
+) -> CryptContext:
+    """Hash with ``scheme`` and verify every supported scheme. Hashes of
+    the other scheme or with a lower cost than configured need an update."""
+    return CryptContext(
+        schemes=[
+            PasswordHashSettings.ARGON2_SCHEME,
+            PasswordHashSettings.BCRYPT_SCHEME,
+        ],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+pwd_context = create_crypt_context()
 
 
 def hash_password(password: str) -> str:
@@ -11,6 +48,135 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
 
 
+def verify_and_update_password(
+    password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify the password and return a new hash when the stored one uses
+    an outdated scheme or cost."""
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+def measure_hash_seconds(context: CryptContext, samples: int = 3) -> float:
+    hashed_password = context.hash("Calibration_password1")
+    started = time.perf_counter()
+    for _ in range(samples):
+        context.verify("Calibration_password1", hashed_password)
+    return (time.perf_counter() - started) / samples
+
+
+def calibrate_password_hash(
+    scheme: str, target_seconds: float
+) -> tuple[dict[str, int], float]:
+    """Find the lowest cost whose verification takes ``target_seconds`` on
+    this machine. bcrypt raises its rounds, argon2id keeps the configured
+    memory and parallelism and raises its time cost."""
+    if scheme == PasswordHashSettings.BCRYPT_SCHEME:
+        parameter, cost, max_cost = "bcrypt_rounds", 4, 31
+    else:
+        parameter, cost, max_cost = "argon2_time_cost", 1, 100
+
+    while True:
+        context = create_crypt_context(scheme=scheme, **{parameter: cost})
+        seconds = measure_hash_seconds(context)
+        if seconds >= target_seconds or cost >= max_cost:
+            break
+        cost += 1
+
+    params = {parameter.upper(): cost}
+    if scheme == PasswordHashSettings.ARGON2_SCHEME:
+        params["ARGON2_MEMORY_COST"] = PasswordHashSettings.argon2_memory_cost
+        params["ARGON2_PARALLELISM"] = PasswordHashSettings.argon2_parallelism
+    return params, seconds
+
+
+class PasswordHasherPool:
+    """Bounded thread pool running password hashing off the event loop.
+
+    bcrypt releases the GIL while hashing, so threads hash in parallel.
+    Calls beyond ``max_workers`` wait in the executor queue, the depth of
+    that queue and the time calls spent in it are exposed by ``stats``.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hasher",
+            )
+        return self._executor
+
+    def _run(self, submitted_at: float, func: Callable[..., T], *args) -> T:
+        waited = time.monotonic() - submitted_at
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            self.queued += 1
+        return await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), self._run, time.monotonic(), func, *args
+        )
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": completed,
+                "wait_ms_avg": round(
+                    self.wait_seconds_total * 1000 / max(completed, 1), 3
+                ),
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool(PasswordHashSettings.workers)
+
+
+async def async_hash_password(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+
+async def async_verify_password(password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(
+        verify_password, password, hashed_password
+    )
+
+
+async def async_verify_and_update_password(
+    password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await password_hasher.run(
+        verify_and_update_password, password, hashed_password
+    )
+
+
 def validate_password(password: str) -> str:
 
     if not any(char.isdigit() for char in password):
@@ -33,4 +199,9 @@ def validate_password(password: str) -> str:
     if any(char in forbidden_symbols for char in password):
         raise ValueError("Password cannot contain this symbols: '@\"'<>\\'")
 
+    if is_breached_password(password):
+        raise ValueError(
+            "Password has appeared in a data breach, choose another one"
+        )
+
     return password
@@ -0,0 +1,36 @@
+from enum import IntFlag
+
+
+class Permission(IntFlag):
+    READ_PROFILE = 1
+    EDIT_PROFILE = 2
+    MANAGE_BALANCE = 4
+    MANAGE_USERS = 8
+    READ_METRICS = 16
+
+
+USER_ROLE = "user"
+ADMIN_ROLE = "admin"
+
+ROLE_PERMISSIONS = {
+    USER_ROLE: (
+        Permission.READ_PROFILE
+        | Permission.EDIT_PROFILE
+        | Permission.MANAGE_BALANCE
+    ),
+    ADMIN_ROLE: (
+        Permission.READ_PROFILE
+        | Permission.EDIT_PROFILE
+        | Permission.MANAGE_USERS
+        | Permission.READ_METRICS
+    ),
+}
+
+# Stamped into access tokens as ``pv`` next to the permission mask. Bump it
+# whenever ROLE_PERMISSIONS changes, tokens carrying an older stamp are
+# re-checked against the role stored in the database.
+ROLE_PERMISSIONS_VERSION = 1
+
+
+def role_permissions(role: str) -> Permission:
+    return ROLE_PERMISSIONS.get(role, Permission(0))
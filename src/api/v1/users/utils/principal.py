@@ -0,0 +1,60 @@
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Any
+
+from src.api.exceptions import INVALID_TOKEN_CREDENTIAL_EXCEPTION
+from src.db.models import User
+from src.db.session import s
+
+
+@dataclass(frozen=True, slots=True)
+class AuthPrincipal:
+    """Immutable snapshot of the authenticated user handed to routes.
+
+    It holds every column but the password hash and is not attached to a
+    session, routes that modify the user ``load`` the ORM object first.
+    """
+
+    id: int
+    email: str | None
+    first_name: str | None
+    last_name: str | None
+    role: str
+    balance: int
+    is_active: bool
+    is_blocked: bool
+    is_deleted: bool
+    created_at: datetime
+    updated_at: datetime
+    role_version: int = 0
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthPrincipal":
+        return cls(*(getattr(user, field) for field in PRINCIPAL_FIELDS))
+
+    @classmethod
+    def from_cached_values(cls, values: dict[str, Any]) -> "AuthPrincipal":
+        values = dict(values)
+        for field in DATETIME_FIELDS:
+            values[field] = datetime.fromisoformat(values[field])
+        return cls(**values)
+
+    def cached_values(self) -> dict[str, Any]:
+        values = asdict(self)
+        for field in DATETIME_FIELDS:
+            values[field] = values[field].isoformat()
+        return values
+
+    async def load(self) -> User:
+        """The ORM user in the request session, taken from its identity map
+        when the route already loaded it."""
+        if (user := await s.user_db.get(User, self.id)) is None:
+            raise INVALID_TOKEN_CREDENTIAL_EXCEPTION
+        return user
+
+    def __str__(self) -> str:
+        return str(self.email)
+
+
+PRINCIPAL_FIELDS = tuple(field.name for field in fields(AuthPrincipal))
+DATETIME_FIELDS = ("created_at", "updated_at")
@@ -0,0 +1,97 @@
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from functools import lru_cache
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+from src.settings import RateLimit, RateLimitSettings
+
+# KEYS: window sorted set.
+# ARGV: now ms, window ms, limit, member.
+# Returns 0 when the hit is admitted, otherwise milliseconds until the
+# oldest hit in the window expires.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return math.max(tonumber(oldest[2]) + window - now, 1)
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window)
+return 0
+"""
+
+
+def rate_limit_key(name: str, value: str) -> str:
+    return f"{RateLimitSettings.PREFIX}{name}:{value}"
+
+
+def retry_after_seconds(retry_after_ms: int) -> int:
+    return max(-(-retry_after_ms // 1000), 1)
+
+
+class RateLimiter(ABC):
+    """Sliding window counter of hits per key.
+
+    ``hit`` records a hit unless the window is full and returns how many
+    seconds the caller has to wait, ``0`` when the hit was admitted.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, rate_limit: RateLimit) -> int:
+        pass
+
+
+class RedisRateLimiter(RateLimiter):
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+        self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+    async def hit(self, key: str, rate_limit: RateLimit) -> int:
+        retry_after_ms = await self._script(
+            keys=[key],
+            args=[
+                int(time.time() * 1000),
+                rate_limit.window_seconds * 1000,
+                rate_limit.limit,
+                uuid4().hex,
+            ],
+        )
+        return retry_after_seconds(retry_after_ms) if retry_after_ms else 0
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """Process local limiter for tests and single worker local runs."""
+
+    def __init__(self) -> None:
+        self._hits: dict[str, deque[float]] = {}
+
+    async def hit(self, key: str, rate_limit: RateLimit) -> int:
+        now = time.time()
+        hits = self._hits.setdefault(key, deque())
+        while hits and hits[0] <= now - rate_limit.window_seconds:
+            hits.popleft()
+
+        if len(hits) >= rate_limit.limit:
+            retry_after = hits[0] + rate_limit.window_seconds - now
+            return retry_after_seconds(int(retry_after * 1000))
+
+        hits.append(now)
+        return 0
+
+    def clear(self) -> None:
+        self._hits.clear()
+
+
+memory_rate_limiter = InMemoryRateLimiter()
+
+
+@lru_cache(maxsize=1)
+def get_redis_rate_limiter(redis: Redis) -> RedisRateLimiter:
+    """The limiter of the pooled client, so its script is registered
+    once."""
+    return RedisRateLimiter(redis)
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from redis.asyncio import Redis
+
+from src.api.v1.users.utils.user_cache import user_cache
+from src.settings import TokenCacheSettings, UserCacheSettings
+
+log = logging.getLogger(__name__)
+
+
+class TokenPayloadCache:
+    """Bounded LRU cache of decoded token payloads keyed by token digest.
+
+    Entries live for ``ttl_seconds`` at most and never outlive the token
+    ``exp`` claim.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, digest: str) -> dict[str, Any] | None:
+        if (entry := self._entries.get(digest)) is None:
+            self.misses += 1
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[digest]
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return payload
+
+    def set(self, digest: str, payload: dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+
+        expires_at = min(
+            time.time() + self.ttl_seconds, int(payload.get("exp", 0))
+        )
+        self._entries[digest] = (expires_at, payload)
+        self._entries.move_to_end(digest)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, digest: str) -> None:
+        self._entries.pop(digest, None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._invalidate_claim("id", user_id)
+
+    def invalidate_session(self, session_id: str) -> None:
+        self._invalidate_claim("sid", session_id)
+
+    def _invalidate_claim(self, claim: str, value: Any) -> None:
+        for digest, (_, payload) in list(self._entries.items()):
+            if payload.get(claim) == value:
+                del self._entries[digest]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+token_payload_cache = TokenPayloadCache(
+    max_size=(
+        TokenCacheSettings.max_size if TokenCacheSettings.enabled else 0
+    ),
+    ttl_seconds=TokenCacheSettings.ttl_seconds,
+)
+
+
+USER_REVOCATION_PREFIX = "user:"
+SESSION_REVOCATION_PREFIX = "session:"
+
+
+def user_revocation_message(user_id: int) -> str:
+    return f"{USER_REVOCATION_PREFIX}{user_id}"
+
+
+def session_revocation_message(session_id: str) -> str:
+    return f"{SESSION_REVOCATION_PREFIX}{session_id}"
+
+
+def handle_revocation_message(data: bytes | str) -> None:
+    """Messages are either a token digest, ``user:<id>`` when every token
+    of the user was revoked, ``session:<sid>`` when a token family was
+    revoked or ``user_record:<id>`` when the user row changed."""
+    if isinstance(data, bytes):
+        data = data.decode()
+
+    if data.startswith(UserCacheSettings.RECORD_PREFIX):
+        user_id = int(data.removeprefix(UserCacheSettings.RECORD_PREFIX))
+        user_cache.invalidate_local(user_id)
+    elif data.startswith(USER_REVOCATION_PREFIX):
+        user_id = int(data.removeprefix(USER_REVOCATION_PREFIX))
+        token_payload_cache.invalidate_user(user_id)
+    elif data.startswith(SESSION_REVOCATION_PREFIX):
+        session_id = data.removeprefix(SESSION_REVOCATION_PREFIX)
+        token_payload_cache.invalidate_session(session_id)
+    else:
+        token_payload_cache.invalidate(data)
+
+
+async def listen_token_revocations(redis: Redis) -> None:
+    """Evict tokens revoked and users changed by any worker from the local
+    caches."""
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(TokenCacheSettings.revocation_channel)
+                while True:
+                    # the pooled client has a socket timeout, so poll
+                    # instead of blocking on listen()
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message is None:
+                        continue
+                    handle_revocation_message(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.error(f"Token revocation listener failed: {e}")
+            # revocations could have been missed while disconnected
+            token_payload_cache.clear()
+            user_cache.clear()
+            await asyncio.sleep(1)
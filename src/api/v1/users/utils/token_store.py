@@ -0,0 +1,539 @@
+import time
+from abc import ABC, abstractmethod
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from redis.asyncio import Redis
+
+from src.api.v1.users.utils.my_jwt import (
+    get_token_ttl,
+    peek_jwt,
+    revoked_token_key,
+    token_digest,
+)
+from src.api.v1.users.utils.token_cache import (
+    session_revocation_message,
+    token_payload_cache,
+    user_revocation_message,
+)
+from src.settings import JWTSettings, TokenCacheSettings, TokenStoreSettings
+
+
+def token_key(token: str) -> str:
+    return f"{TokenStoreSettings.TOKEN_PREFIX}{token_digest(token)}"
+
+
+def sessions_key(user_id: int) -> str:
+    return f"{TokenStoreSettings.SESSIONS_PREFIX}{user_id}"
+
+
+def generation_key(user_id: int) -> str:
+    return f"{TokenStoreSettings.GENERATION_PREFIX}{user_id}"
+
+
+def family_key(session_id: str) -> str:
+    return f"{TokenStoreSettings.FAMILY_PREFIX}{session_id}"
+
+
+def family_revoked_key(session_id: str) -> str:
+    return f"{TokenStoreSettings.FAMILY_REVOKED_PREFIX}{session_id}"
+
+
+def consumed_key(token: str) -> str:
+    return f"{TokenStoreSettings.CONSUMED_PREFIX}{token_digest(token)}"
+
+
+def role_version_key(user_id: int) -> str:
+    return f"{TokenStoreSettings.ROLE_VERSION_PREFIX}{user_id}"
+
+
+def is_refresh_token(payload: dict[str, Any]) -> bool:
+    return payload.get("type") == JWTSettings.REFRESH_TOKEN_TYPE
+
+
+class RotationResult(IntEnum):
+    ROTATED = 1
+    INVALID = 0
+    FAMILY_REVOKED = -1
+    REUSED = -2
+
+
+# KEYS: old refresh, consumed marker of old refresh, family revoked marker,
+# user generation, family current refresh, new access, new refresh,
+# user sessions.
+# ARGV: generation, session id, consumed marker ttl, access payload,
+# access ttl, refresh payload, refresh ttl, refresh exp, store access flag,
+# revocation channel, family revocation message.
+ROTATE_REFRESH_TOKEN_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    return -1
+end
+if (tonumber(redis.call('GET', KEYS[4])) or 0) ~= tonumber(ARGV[1]) then
+    return 0
+end
+if redis.call('DEL', KEYS[1]) == 0 then
+    if redis.call('EXISTS', KEYS[2]) == 0 then
+        return 0
+    end
+    local current = redis.call('GET', KEYS[5])
+    if current then
+        redis.call('DEL', current)
+    end
+    redis.call('DEL', KEYS[5])
+    redis.call('SET', KEYS[3], 1, 'EX', ARGV[7])
+    redis.call('ZREM', KEYS[8], ARGV[2])
+    redis.call('PUBLISH', ARGV[10], ARGV[11])
+    return -2
+end
+redis.call('SET', KEYS[2], 1, 'EX', ARGV[3])
+if ARGV[9] == '1' then
+    redis.call('SET', KEYS[6], ARGV[4], 'EX', ARGV[5])
+end
+redis.call('SET', KEYS[7], ARGV[6], 'EX', ARGV[7])
+redis.call('SET', KEYS[5], KEYS[7], 'EX', ARGV[7])
+redis.call('ZADD', KEYS[8], ARGV[8], ARGV[2])
+redis.call('EXPIRE', KEYS[8], ARGV[7], 'NX')
+redis.call('EXPIRE', KEYS[8], ARGV[7], 'GT')
+return 1
+"""
+
+
+# KEYS: user role version.
+# ARGV: role version.
+RAISE_ROLE_VERSION_SCRIPT = """
+if (tonumber(redis.call('GET', KEYS[1])) or 0) < tonumber(ARGV[1]) then
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+"""
+
+
+def is_current_generation(
+    payload: dict[str, Any], generation: bytes | int | None
+) -> bool:
+    return int(payload.get("gen", 0)) == int(generation or 0)
+
+
+class TokenStore(ABC):
+    """Storage for issued tokens keyed by the SHA-256 digest of the token.
+
+    Every user has a token generation counter which is stamped into issued
+    tokens as ``gen``; bumping it revokes all outstanding tokens at once.
+    Tokens issued by one login share a session id ``sid`` which is also the
+    refresh token family: reusing a rotated refresh token revokes it.
+    """
+
+    @abstractmethod
+    async def save(self, *tokens: tuple[str, dict[str, Any]]) -> None:
+        """Store token payloads until their ``exp`` and index their
+        sessions in one round trip."""
+
+    @abstractmethod
+    async def get(self, token: str) -> dict[str, Any] | None:
+        """Return the stored payload unless the token is missing or
+        belongs to an older generation."""
+
+    @abstractmethod
+    async def get_many(self, tokens: list[str]) -> list[dict[str, Any] | None]:
+        """Batch ``get`` resolved in one round trip."""
+
+    @abstractmethod
+    async def is_revoked(self, payload: dict[str, Any]) -> bool:
+        pass
+
+    @abstractmethod
+    async def are_revoked(self, payloads: list[dict[str, Any]]) -> list[bool]:
+        """Batch ``is_revoked`` resolved in one round trip."""
+
+    @abstractmethod
+    async def revoke(self, token: str, payload: dict[str, Any]) -> None:
+        """Drop the stored token, mark its ``jti`` as revoked, remove its
+        session from the user sessions and evict it from every worker token
+        cache."""
+
+    @abstractmethod
+    async def rotate(
+        self,
+        token: str,
+        payload: dict[str, Any],
+        refresh: tuple[str, dict[str, Any]],
+        access: tuple[str, dict[str, Any]] | None = None,
+    ) -> RotationResult:
+        """Atomically consume the refresh token and store its successors.
+
+        Presenting an already consumed refresh token revokes its family.
+        """
+
+    @abstractmethod
+    async def get_generation(self, user_id: int) -> int:
+        pass
+
+    @abstractmethod
+    async def revoke_all(self, user_id: int) -> None:
+        """Invalidate every outstanding token of the user."""
+
+    @abstractmethod
+    async def get_sessions(self, user_id: int) -> list[tuple[str, int]]:
+        """Return ``(session_id, expires_at)`` of the live user sessions."""
+
+    @abstractmethod
+    async def get_role_version(self, user_id: int) -> int:
+        """The last role version of the user published by ``set``."""
+
+    @abstractmethod
+    async def set_role_version(self, user_id: int, role_version: int) -> None:
+        """Publish the role version committed with a role change, versions
+        lower than the stored one are ignored."""
+
+
+class RedisTokenStore(TokenStore):
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+        self._rotate_script = redis.register_script(
+            ROTATE_REFRESH_TOKEN_SCRIPT
+        )
+        self._role_version_script = redis.register_script(
+            RAISE_ROLE_VERSION_SCRIPT
+        )
+
+    async def save(self, *tokens: tuple[str, dict[str, Any]]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for token, payload in tokens:
+                ttl = get_token_ttl(payload)
+                pipe.set(token_key(token), orjson.dumps(payload), ex=ttl)
+                if payload.get("sid") and payload.get("id") is not None:
+                    key = sessions_key(payload["id"])
+                    pipe.zadd(key, {payload["sid"]: payload["exp"]}, gt=True)
+                    # Only ever extend the index TTL, a short lived access
+                    # token must not expire the sessions of the user.
+                    pipe.expire(key, ttl, nx=True)
+                    pipe.expire(key, ttl, gt=True)
+                if payload.get("sid") and is_refresh_token(payload):
+                    pipe.set(
+                        family_key(payload["sid"]), token_key(token), ex=ttl
+                    )
+            await pipe.execute()
+
+    async def get(self, token: str) -> dict[str, Any] | None:
+        claims = peek_jwt(token)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(token_key(token))
+            self._queue_validity_checks(pipe, claims)
+            payload, *checks = await pipe.execute()
+
+        if payload is None:
+            return None
+
+        payload = orjson.loads(payload)
+        if not self._is_valid(payload, checks):
+            return None
+        return payload
+
+    async def get_many(self, tokens: list[str]) -> list[dict[str, Any] | None]:
+        if not tokens:
+            return []
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            check_counts = []
+            for token in tokens:
+                pipe.get(token_key(token))
+                check_counts.append(
+                    self._queue_validity_checks(pipe, peek_jwt(token))
+                )
+            results = iter(await pipe.execute())
+
+        payloads = []
+        for check_count in check_counts:
+            payload = next(results)
+            checks = [next(results) for _ in range(check_count)]
+            if payload is not None:
+                payload = orjson.loads(payload)
+                if not self._is_valid(payload, checks):
+                    payload = None
+            payloads.append(payload)
+        return payloads
+
+    async def is_revoked(self, payload: dict[str, Any]) -> bool:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.exists(revoked_token_key(payload))
+            self._queue_validity_checks(pipe, payload)
+            revoked, *checks = await pipe.execute()
+
+        return bool(revoked) or not self._is_valid(payload, checks)
+
+    async def are_revoked(self, payloads: list[dict[str, Any]]) -> list[bool]:
+        if not payloads:
+            return []
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            check_counts = []
+            for payload in payloads:
+                pipe.exists(revoked_token_key(payload))
+                check_counts.append(self._queue_validity_checks(pipe, payload))
+            results = iter(await pipe.execute())
+
+        revoked = []
+        for payload, check_count in zip(payloads, check_counts):
+            is_revoked = bool(next(results))
+            checks = [next(results) for _ in range(check_count)]
+            revoked.append(is_revoked or not self._is_valid(payload, checks))
+        return revoked
+
+    @staticmethod
+    def _queue_validity_checks(pipe: Any, claims: dict[str, Any]) -> int:
+        """Queue the generation and family checks of the claims and return
+        how many commands were queued."""
+        queued = 0
+        if claims.get("id") is not None:
+            pipe.get(generation_key(claims["id"]))
+            queued += 1
+        if claims.get("sid"):
+            pipe.exists(family_revoked_key(claims["sid"]))
+            queued += 1
+        return queued
+
+    @staticmethod
+    def _is_valid(payload: dict[str, Any], checks: list[Any]) -> bool:
+        checks = iter(checks)
+        if payload.get("id") is not None and not is_current_generation(
+            payload, next(checks, None)
+        ):
+            return False
+        if payload.get("sid") and next(checks, 0):
+            return False
+        return True
+
+    async def revoke(self, token: str, payload: dict[str, Any]) -> None:
+        digest = token_digest(token)
+        token_payload_cache.invalidate(digest)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(token_key(token))
+            pipe.set(revoked_token_key(payload), 1, ex=get_token_ttl(payload))
+            if payload.get("sid") and payload.get("id") is not None:
+                pipe.zrem(sessions_key(payload["id"]), payload["sid"])
+            pipe.publish(TokenCacheSettings.revocation_channel, digest)
+            await pipe.execute()
+
+    async def rotate(
+        self,
+        token: str,
+        payload: dict[str, Any],
+        refresh: tuple[str, dict[str, Any]],
+        access: tuple[str, dict[str, Any]] | None = None,
+    ) -> RotationResult:
+        refresh_token, refresh_payload = refresh
+        access_token, access_payload = access or ("", {"exp": 0})
+        session_id = payload["sid"]
+
+        result = await self._rotate_script(
+            keys=[
+                token_key(token),
+                consumed_key(token),
+                family_revoked_key(session_id),
+                generation_key(payload["id"]),
+                family_key(session_id),
+                token_key(access_token),
+                token_key(refresh_token),
+                sessions_key(payload["id"]),
+            ],
+            args=[
+                int(payload.get("gen", 0)),
+                session_id,
+                get_token_ttl(payload),
+                orjson.dumps(access_payload),
+                get_token_ttl(access_payload),
+                orjson.dumps(refresh_payload),
+                get_token_ttl(refresh_payload),
+                refresh_payload["exp"],
+                int(access is not None),
+                TokenCacheSettings.revocation_channel,
+                session_revocation_message(session_id),
+            ],
+        )
+        if result == RotationResult.REUSED:
+            token_payload_cache.invalidate_session(session_id)
+        return RotationResult(result)
+
+    async def get_generation(self, user_id: int) -> int:
+        return int(await self.redis.get(generation_key(user_id)) or 0)
+
+    async def revoke_all(self, user_id: int) -> None:
+        token_payload_cache.invalidate_user(user_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.incr(generation_key(user_id))
+            pipe.delete(sessions_key(user_id))
+            pipe.publish(
+                TokenCacheSettings.revocation_channel,
+                user_revocation_message(user_id),
+            )
+            await pipe.execute()
+
+    async def get_sessions(self, user_id: int) -> list[tuple[str, int]]:
+        key = sessions_key(user_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(key, "-inf", int(time.time()))
+            pipe.zrange(key, 0, -1, withscores=True)
+            _, sessions = await pipe.execute()
+
+        return [
+            (session_id.decode(), int(expires_at))
+            for session_id, expires_at in sessions
+        ]
+
+    async def get_role_version(self, user_id: int) -> int:
+        return int(await self.redis.get(role_version_key(user_id)) or 0)
+
+    async def set_role_version(self, user_id: int, role_version: int) -> None:
+        await self._role_version_script(
+            keys=[role_version_key(user_id)], args=[role_version]
+        )
+
+
+class InMemoryTokenStore(TokenStore):
+    """Process local store for tests and single worker local runs."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[float, bytes]] = {}
+        self._generations: dict[int, int] = {}
+        self._sessions: dict[int, dict[str, int]] = {}
+        self._families: dict[str, str] = {}
+        self._role_versions: dict[int, int] = {}
+
+    def _get(self, key: str) -> bytes | None:
+        if (entry := self._data.get(key)) is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._data[key]
+            return None
+        return value
+
+    def _set(self, key: str, value: bytes, ttl: int) -> None:
+        self._data[key] = (time.time() + ttl, value)
+
+    async def save(self, *tokens: tuple[str, dict[str, Any]]) -> None:
+        for token, payload in tokens:
+            self._set(
+                token_key(token), orjson.dumps(payload), get_token_ttl(payload)
+            )
+            if payload.get("sid") and payload.get("id") is not None:
+                sessions = self._sessions.setdefault(payload["id"], {})
+                sessions[payload["sid"]] = max(
+                    sessions.get(payload["sid"], 0), payload["exp"]
+                )
+            if payload.get("sid") and is_refresh_token(payload):
+                self._families[payload["sid"]] = token_key(token)
+
+    async def get(self, token: str) -> dict[str, Any] | None:
+        if (payload := self._get(token_key(token))) is None:
+            return None
+
+        payload = orjson.loads(payload)
+        if not self._is_valid(payload):
+            return None
+        return payload
+
+    async def get_many(self, tokens: list[str]) -> list[dict[str, Any] | None]:
+        return [await self.get(token) for token in tokens]
+
+    async def is_revoked(self, payload: dict[str, Any]) -> bool:
+        if self._get(revoked_token_key(payload)) is not None:
+            return True
+        return not self._is_valid(payload)
+
+    async def are_revoked(self, payloads: list[dict[str, Any]]) -> list[bool]:
+        return [await self.is_revoked(payload) for payload in payloads]
+
+    def _is_valid(self, payload: dict[str, Any]) -> bool:
+        if payload.get("id") is not None and not is_current_generation(
+            payload, self._generations.get(payload["id"])
+        ):
+            return False
+        if payload.get("sid") and self._get(
+            family_revoked_key(payload["sid"])
+        ):
+            return False
+        return True
+
+    async def revoke(self, token: str, payload: dict[str, Any]) -> None:
+        token_payload_cache.invalidate(token_digest(token))
+        self._data.pop(token_key(token), None)
+        self._set(revoked_token_key(payload), b"1", get_token_ttl(payload))
+        if payload.get("sid") and payload.get("id") is not None:
+            self._sessions.get(payload["id"], {}).pop(payload["sid"], None)
+
+    async def rotate(
+        self,
+        token: str,
+        payload: dict[str, Any],
+        refresh: tuple[str, dict[str, Any]],
+        access: tuple[str, dict[str, Any]] | None = None,
+    ) -> RotationResult:
+        session_id = payload["sid"]
+        if self._get(family_revoked_key(session_id)) is not None:
+            return RotationResult.FAMILY_REVOKED
+        if not is_current_generation(
+            payload, self._generations.get(payload["id"])
+        ):
+            return RotationResult.INVALID
+
+        if self._data.pop(token_key(token), None) is None:
+            if self._get(consumed_key(token)) is None:
+                return RotationResult.INVALID
+
+            token_payload_cache.invalidate_session(session_id)
+            if (current := self._families.pop(session_id, None)) is not None:
+                self._data.pop(current, None)
+            self._set(
+                family_revoked_key(session_id),
+                b"1",
+                get_token_ttl(refresh[1]),
+            )
+            self._sessions.get(payload["id"], {}).pop(session_id, None)
+            return RotationResult.REUSED
+
+        self._set(consumed_key(token), b"1", get_token_ttl(payload))
+        tokens = (refresh,) if access is None else (access, refresh)
+        await self.save(*tokens)
+        return RotationResult.ROTATED
+
+    async def get_generation(self, user_id: int) -> int:
+        return self._generations.get(user_id, 0)
+
+    async def revoke_all(self, user_id: int) -> None:
+        token_payload_cache.invalidate_user(user_id)
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        self._sessions.pop(user_id, None)
+
+    async def get_sessions(self, user_id: int) -> list[tuple[str, int]]:
+        now = int(time.time())
+        sessions = self._sessions.get(user_id, {})
+        for session_id, expires_at in list(sessions.items()):
+            if expires_at <= now:
+                del sessions[session_id]
+        return sorted(sessions.items(), key=lambda session: session[1])
+
+    async def get_role_version(self, user_id: int) -> int:
+        return self._role_versions.get(user_id, 0)
+
+    async def set_role_version(self, user_id: int, role_version: int) -> None:
+        self._role_versions[user_id] = max(
+            self._role_versions.get(user_id, 0), role_version
+        )
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._generations.clear()
+        self._sessions.clear()
+        self._families.clear()
+        self._role_versions.clear()
+
+
+memory_token_store = InMemoryTokenStore()
+
+
+@lru_cache(maxsize=1)
+def get_redis_token_store(redis: Redis) -> RedisTokenStore:
+    """The store of the pooled client, so its script is registered once."""
+    return RedisTokenStore(redis)
@@ -0,0 +1,171 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+import orjson
+from redis.asyncio import Redis
+
+from src.db.redis_pool import get_redis
+from src.settings import TokenCacheSettings, UserCacheSettings
+
+
+def user_version_key(user_id: int) -> str:
+    return f"{UserCacheSettings.VERSION_PREFIX}{user_id}"
+
+
+def user_record_key(user_id: int) -> str:
+    return f"{UserCacheSettings.RECORD_PREFIX}{user_id}"
+
+
+class UserCache:
+    """Two tier cache of user rows keyed by user id: a bounded in-process
+    LRU in front of Redis.
+
+    Every user has a version counter in Redis which is bumped whenever the
+    row changes. Shared entries carry the version read *before* the row was
+    loaded and are ignored once the counter moved on, so a row loaded
+    concurrently with an update is never served after it. ``set`` checks the
+    counter again before filling the local tier, which has no version. Local
+    entries are evicted through the revocation channel and live
+    ``local_ttl_seconds`` at most, in case a message was missed. Without
+    Redis a process wide invalidation counter plays the version.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        local_ttl_seconds: float,
+        ttl_seconds: int,
+        get_redis: Callable[[], Redis] | None = None,
+    ) -> None:
+        self.max_size = max_size
+        self.local_ttl_seconds = local_ttl_seconds
+        self.ttl_seconds = ttl_seconds
+        self._get_redis = get_redis
+        self._entries: OrderedDict[int, tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self._local_version = 0
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _get_local(self, user_id: int) -> dict[str, Any] | None:
+        if (entry := self._entries.get(user_id)) is None:
+            return None
+
+        expires_at, values = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+
+        self._entries.move_to_end(user_id)
+        return values
+
+    def _set_local(self, user_id: int, values: dict[str, Any]) -> None:
+        expires_at = time.monotonic() + self.local_ttl_seconds
+        self._entries[user_id] = (expires_at, values)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(
+        self, user_id: int, email: str
+    ) -> tuple[dict[str, Any] | None, int]:
+        """Cached values of the user if its email is still ``email``, and
+        the version to pass to ``set`` after loading the row on a miss."""
+        if self.max_size <= 0:
+            return None, 0
+
+        values = self._get_local(user_id)
+        if values is not None and values["email"] == email:
+            self.local_hits += 1
+            return values, 0
+
+        if self._get_redis is None:
+            self.misses += 1
+            return None, self._local_version
+
+        version, entry = await self._get_redis().mget(
+            user_version_key(user_id), user_record_key(user_id)
+        )
+        version = int(version or 0)
+        if entry is not None:
+            cached_version, values = orjson.loads(entry)
+            if cached_version == version and values["email"] == email:
+                self._set_local(user_id, values)
+                self.shared_hits += 1
+                return values, version
+
+        self.misses += 1
+        return None, version
+
+    async def set(
+        self, user_id: int, version: int, values: dict[str, Any]
+    ) -> None:
+        """Cache values loaded after ``get`` returned ``version``, unless the
+        user was invalidated meanwhile."""
+        if self.max_size <= 0:
+            return
+
+        if self._get_redis is None:
+            if version == self._local_version:
+                self._set_local(user_id, values)
+            return
+
+        redis = self._get_redis()
+        if int(await redis.get(user_version_key(user_id)) or 0) != version:
+            return
+        self._set_local(user_id, values)
+        await redis.set(
+            user_record_key(user_id),
+            orjson.dumps((version, values)),
+            ex=self.ttl_seconds,
+        )
+
+    async def invalidate(self, user_id: int) -> None:
+        """Bump the user version and evict the user from every worker."""
+        self.invalidations += 1
+        self.invalidate_local(user_id)
+        if self._get_redis is None:
+            return
+
+        async with self._get_redis().pipeline(transaction=False) as pipe:
+            pipe.incr(user_version_key(user_id))
+            pipe.delete(user_record_key(user_id))
+            pipe.publish(
+                TokenCacheSettings.revocation_channel,
+                user_record_key(user_id),
+            )
+            await pipe.execute()
+
+    def invalidate_local(self, user_id: int) -> None:
+        self._local_version += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._local_version += 1
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+user_cache = UserCache(
+    max_size=UserCacheSettings.max_size if UserCacheSettings.enabled else 0,
+    local_ttl_seconds=UserCacheSettings.local_ttl_seconds,
+    ttl_seconds=UserCacheSettings.ttl_seconds,
+    get_redis=(
+        None
+        if UserCacheSettings.backend == UserCacheSettings.MEMORY_BACKEND
+        else get_redis
+    ),
+)
@@ -0,0 +1,55 @@
+import hashlib
+
+from fastapi import APIRouter, Request, Response
+
+import orjson
+from starlette import status
+
+from src.api.v1.users.utils.keys import get_key_ring
+from src.settings import SecuritySettings
+
+router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+
+class JWKSDocument:
+    """Serialized once, keys only change with a restart."""
+
+    def __init__(self) -> None:
+        self.body = orjson.dumps(get_key_ring().jwks())
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.headers = {
+            "Cache-Control": (
+                f"public, max-age={SecuritySettings.JWKS_MAX_AGE_SECONDS}, "
+                "stale-while-revalidate=86400"
+            ),
+            "ETag": self.etag,
+        }
+
+
+jwks_document: JWKSDocument | None = None
+
+
+def get_jwks_document() -> JWKSDocument:
+    global jwks_document
+    if jwks_document is None:
+        jwks_document = JWKSDocument()
+    return jwks_document
+
+
+@router.get(
+    "/jwks.json",
+    status_code=status.HTTP_200_OK,
+    description="Public keys to verify access tokens",
+)
+async def get_jwks(request: Request) -> Response:
+    document = get_jwks_document()
+    if request.headers.get("if-none-match") == document.etag:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=document.headers
+        )
+
+    return Response(
+        content=document.body,
+        media_type="application/json",
+        headers=document.headers,
+    )
@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from typing import AsyncGenerator
 
 from fastapi import APIRouter, FastAPI, HTTPException
@@ -7,11 +8,26 @@ from fastapi import APIRouter, FastAPI, HTTPException
 from uvicorn import Config, Server
 
 from src.api.routers import api_router_v1
-from src.db.session import close_dbs
+from src.api.v1.users.crud import WARM_UP_QUERIES
+from src.api.v1.users.fast_crud import user_fast_path
+from src.api.v1.users.utils.breached_passwords import (
+    get_breached_password_filter,
+)
+from src.api.v1.users.utils.keys import get_key_ring
+from src.api.v1.users.utils.password import password_hasher
+from src.api.v1.users.utils.token_cache import listen_token_revocations
+from src.api.well_known.routes import router as well_known_router
+from src.db.redis_pool import close_redis, get_redis
+from src.db.session import (
+    close_dbs,
+    get_async_pool,
+    replica_router,
+    warm_up_pool,
+)
 from src.error_handler import http_exception_handler
 from src.logger import logger_config
 from src.middlewares import LoggingMiddleware
-from src.settings import AppSettings
+from src.settings import AppSettings, DbSettings
 
 logger_config()
 
@@ -21,9 +37,35 @@ log = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(my_app: FastAPI) -> AsyncGenerator[None, None]:
     log.info("Start application")
+    get_key_ring()
+    get_breached_password_filter()
+    if DbSettings.warm_up_connections:
+        await warm_up_pool(
+            await get_async_pool(DbSettings.get_async_db_url()),
+            DbSettings.warm_up_connections,
+            WARM_UP_QUERIES,
+        )
+    if DbSettings.fast_path:
+        await user_fast_path.get_pool()
+    background_tasks = [
+        asyncio.create_task(listen_token_revocations(get_redis()))
+    ]
+    if replica_router.urls:
+        background_tasks.append(
+            asyncio.create_task(
+                replica_router.monitor(DbSettings.replica_check_interval)
+            )
+        )
     yield
     log.info("Application shutdown")
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
     await close_dbs()
+    await user_fast_path.close()
+    await close_redis()
+    password_hasher.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -32,6 +74,7 @@ main_api_router = APIRouter(prefix="/api")
 main_api_router.include_router(api_router_v1)
 
 app.include_router(main_api_router)
+app.include_router(well_known_router)
 
 app.add_middleware(LoggingMiddleware)
 
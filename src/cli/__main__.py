@@ -1,14 +1,87 @@
 import click
 
+from src.api.v1.users.utils.breached_passwords import (
+    build_breached_password_filter,
+)
+from src.api.v1.users.utils.password import calibrate_password_hash
 from src.db.utils import upgrade_database
-from src.settings import DbSettings
+from src.settings import (
+    BreachedPasswordSettings,
+    DbSettings,
+    PasswordHashSettings,
+)
 
 
 @click.command()
 @click.option("--upgrade", is_flag=True, help="Upgrade alembic head")
-def cli(upgrade: bool) -> None:
+@click.option(
+    "--calibrate-password-hash",
+    is_flag=True,
+    help="Pick password hash cost hitting the target verification latency",
+)
+@click.option(
+    "--scheme",
+    type=click.Choice(
+        [
+            PasswordHashSettings.ARGON2_SCHEME,
+            PasswordHashSettings.BCRYPT_SCHEME,
+        ]
+    ),
+    default=PasswordHashSettings.scheme,
+    show_default=True,
+    help="Password hash scheme to calibrate",
+)
+@click.option(
+    "--target-ms",
+    type=int,
+    default=250,
+    show_default=True,
+    help="Target password verification latency",
+)
+@click.option(
+    "--build-breached-passwords",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Build the breached password filter from a SHA-1 hash list",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=BreachedPasswordSettings.bloom_filter_path or None,
+    help="Breached password filter path, BREACHED_PASSWORDS_BLOOM_PATH "
+    "by default",
+)
+def cli(
+    upgrade: bool,
+    calibrate_password_hash: bool,
+    scheme: str,
+    target_ms: int,
+    build_breached_passwords: str | None,
+    output: str | None,
+) -> None:
     if upgrade:
         upgrade_database(DbSettings.get_sync_db_url())
+    if calibrate_password_hash:
+        _calibrate_password_hash(scheme, target_ms)
+    if build_breached_passwords:
+        _build_breached_passwords(build_breached_passwords, output)
+
+
+def _calibrate_password_hash(scheme: str, target_ms: int) -> None:
+    params, seconds = calibrate_password_hash(scheme, target_ms / 1000)
+    click.echo(f"# {scheme} verification takes {seconds * 1000:.0f} ms")
+    click.echo(f"PASSWORD_HASH_SCHEME={scheme}")
+    for name, value in params.items():
+        click.echo(f"{name}={value}")
+
+
+def _build_breached_passwords(hashes_path: str, output: str | None) -> None:
+    if output is None:
+        raise click.UsageError("--output or BREACHED_PASSWORDS_BLOOM_PATH")
+
+    added = build_breached_password_filter(
+        hashes_path, output, BreachedPasswordSettings.false_positive_rate
+    )
+    click.echo(f"Added {added} breached password hashes to {output}")
 
 
 if __name__ == "__main__":
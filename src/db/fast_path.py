@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+import asyncpg
+
+from src.settings import DbSettings
+
+log = logging.getLogger(__name__)
+
+
+class FastPathConnection(asyncpg.Connection):
+    """Connection holding the named prepared statements of its pool."""
+
+    __slots__ = ("statements",)
+
+
+class FastPathPool:
+    """Plain asyncpg pool for hot lookups that bypass the ORM.
+
+    Every ``statements`` query is prepared under its name once per
+    connection when the connection is opened, so a lookup is a single
+    bind and execute round trip. Named statements need session pooling if
+    a connection pooler sits in front of the database.
+    """
+
+    STATEMENT_PREFIX = "fast_path_"
+
+    def __init__(
+        self,
+        statements: dict[str, str],
+        dsn: str = DbSettings.get_asyncpg_dsn(),
+        max_size: int = DbSettings.fast_path_pool_size,
+    ) -> None:
+        self.statements = statements
+        self.dsn = dsn
+        self.max_size = max_size
+        self._pool: asyncpg.Pool | None = None
+        self._lock = asyncio.Lock()
+
+    async def _prepare_statements(self, conn: FastPathConnection) -> None:
+        conn.statements = {
+            name: await conn.prepare(
+                query, name=f"{self.STATEMENT_PREFIX}{name}"
+            )
+            for name, query in self.statements.items()
+        }
+
+    async def get_pool(self) -> asyncpg.Pool:
+        if self._pool is not None:
+            return self._pool
+
+        async with self._lock:
+            if self._pool is None:
+                self._pool = await asyncpg.create_pool(
+                    self.dsn,
+                    min_size=1,
+                    max_size=self.max_size,
+                    init=self._prepare_statements,
+                    connection_class=FastPathConnection,
+                    **DbSettings.get_connect_args(),
+                )
+                log.info("Fast path connection pool created")
+
+        return self._pool
+
+    async def fetchrow(self, name: str, *args) -> asyncpg.Record | None:
+        pool = await self.get_pool()
+        async with pool.acquire() as conn:
+            return await conn.statements[name].fetchrow(*args)
+
+    async def fetchval(self, name: str, *args):
+        pool = await self.get_pool()
+        async with pool.acquire() as conn:
+            return await conn.statements[name].fetchval(*args)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+            log.info("Fast path connection pool closed")
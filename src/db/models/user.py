@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import func
+from sqlalchemy import Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, validates
 
 from src.db.models.base import Base
@@ -8,6 +8,19 @@ from src.db.models.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    # Indexes behind the admin user listing filters and orderings. Blocked,
+    # deleted and inactive users are rare, so they get partial indexes.
+    __table_args__ = (
+        Index("ix_users_first_name", "first_name"),
+        Index("ix_users_last_name", "last_name"),
+        Index("ix_users_balance", "balance"),
+        Index("ix_users_updated_at", "updated_at"),
+        Index("ix_users_blocked", "id", postgresql_where=text("is_blocked")),
+        Index("ix_users_deleted", "id", postgresql_where=text("is_deleted")),
+        Index(
+            "ix_users_inactive", "id", postgresql_where=text("NOT is_active")
+        ),
+    )
 
     email: Mapped[str | None] = mapped_column(unique=True, nullable=True)
     password: Mapped[str] = mapped_column()
@@ -16,6 +29,11 @@ class User(Base):
     last_name: Mapped[str | None] = mapped_column(nullable=True)
 
     role: Mapped[str] = mapped_column(default="user")
+    # Bumped with every role change and stamped into access tokens as
+    # ``rv``, permission claims of older tokens are re-checked.
+    role_version: Mapped[int] = mapped_column(
+        default=0, server_default=text("0")
+    )
     balance: Mapped[int] = mapped_column(default=0)
 
     is_active: Mapped[bool] = mapped_column(default=True)
@@ -0,0 +1,78 @@
+import time
+from typing import Any
+from weakref import WeakKeyDictionary, WeakSet
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that also tracks how long checkouts wait for a
+    connection and how many are waiting right now.
+
+    The wait excludes the time spent opening new connections, checkouts
+    that raise are counted as failures instead of waits.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.waiters = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._connect_seconds: WeakKeyDictionary[
+            ConnectionPoolEntry, float
+        ] = WeakKeyDictionary()
+        self._timed: WeakSet[ConnectionPoolEntry] = WeakSet()
+
+    def _create_connection(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        record = super()._create_connection()
+        self._connect_seconds[record] = time.perf_counter() - started
+        return record
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        self.waiters += 1
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except Exception:
+            self.checkout_failures += 1
+            raise
+        finally:
+            self.waiters -= 1
+
+        # QueuePool retries by calling _do_get again, only the innermost
+        # call of a checkout records its wait.
+        if record in self._timed:
+            return record
+        self._timed.add(record)
+
+        waited = max(
+            time.perf_counter()
+            - started
+            - self._connect_seconds.pop(record, 0.0),
+            0.0,
+        )
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return record
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        self._timed.discard(record)
+        super()._do_return_conn(record)
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "waiters": self.waiters,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "wait_ms_avg": round(
+                self.wait_seconds_total * 1000 / max(self.checkouts, 1), 3
+            ),
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+        }
@@ -0,0 +1,41 @@
+import logging
+
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from src.settings import RedisSettings
+
+log = logging.getLogger(__name__)
+
+
+redis_client: Redis | None = None
+
+
+def _create_redis_client() -> Redis:
+    pool = BlockingConnectionPool(
+        host=RedisSettings.host,
+        port=RedisSettings.port,
+        max_connections=RedisSettings.max_connections,
+        timeout=RedisSettings.pool_timeout,
+        socket_timeout=RedisSettings.socket_timeout,
+        socket_connect_timeout=RedisSettings.socket_connect_timeout,
+        health_check_interval=RedisSettings.health_check_interval,
+        retry_on_timeout=RedisSettings.retry_on_timeout,
+    )
+    return Redis.from_pool(pool)
+
+
+def get_redis() -> Redis:
+    global redis_client
+    if redis_client is None:
+        redis_client = _create_redis_client()
+        log.info("Redis connection pool created")
+
+    return redis_client
+
+
+async def close_redis() -> None:
+    global redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+        redis_client = None
+        log.info("Redis connection pool closed")
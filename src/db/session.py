@@ -1,26 +1,26 @@
+import asyncio
 import logging
-from asyncio import current_task
+from contextlib import AsyncExitStack
 from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Sequence
+from weakref import WeakKeyDictionary
 
-from sqlalchemy import select
+from sqlalchemy import Executable, select, text
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
-    async_scoped_session,
     async_sessionmaker,
     create_async_engine,
 )
 
+from src.db.pool import InstrumentedAsyncPool
 from src.settings import DbSettings
 
 log = logging.getLogger(__name__)
 
 
-user_db = ContextVar[AsyncSession]("user_db")
-
-
 @dataclass
 class EnginePool:
     engine: AsyncEngine
@@ -28,6 +28,9 @@ class EnginePool:
 
 
 session_pools: dict[str, EnginePool] = {}
+session_pools_locks: WeakKeyDictionary[
+    asyncio.AbstractEventLoop, asyncio.Lock
+] = WeakKeyDictionary()
 
 
 class SessionException(Exception):
@@ -38,20 +41,77 @@ class EngineCreationException(Exception):
     pass
 
 
+@dataclass
+class LazySession:
+    maker: async_sessionmaker | None = None
+    session: AsyncSession | None = None
+
+    def get(self) -> AsyncSession:
+        if self.session is None:
+            if self.maker is None:
+                raise SessionException("No database session in this context")
+            self.session = self.maker()
+        return self.session
+
+    def has_pending_changes(self) -> bool:
+        return self.session is not None and bool(
+            self.session.new or self.session.dirty or self.session.deleted
+        )
+
+
+user_db = ContextVar[LazySession]("user_db")
+read_db = ContextVar[LazySession]("read_db")
+
+
+def _session_pools_lock() -> asyncio.Lock:
+    """An asyncio lock binds to the first loop waiting on it, tests and CLI
+    commands run one loop each, so every loop gets its own lock."""
+    loop = asyncio.get_running_loop()
+    if (lock := session_pools_locks.get(loop)) is None:
+        lock = session_pools_locks[loop] = asyncio.Lock()
+    return lock
+
+
 async def get_async_pool(
     db_url: str = DbSettings.get_async_db_url(),
 ) -> EnginePool:
-    current = session_pools.get(db_url)
-    if current is None:
-        engine = _create_async_engine(db_url)
-        await _check_connection(engine)
-        maker = _create_async_sessionmaker(engine)
-        current = EnginePool(engine=engine, maker=maker)
-        session_pools[db_url] = current
+    if (current := session_pools.get(db_url)) is not None:
+        return current
+
+    async with _session_pools_lock():
+        current = session_pools.get(db_url)
+        if current is None:
+            engine = _create_async_engine(db_url)
+            await _check_connection(engine)
+            maker = _create_async_sessionmaker(engine)
+            current = EnginePool(engine=engine, maker=maker)
+            session_pools[db_url] = current
 
     return current
 
 
+async def warm_up_pool(
+    pool: EnginePool, connections: int, statements: Sequence[Executable]
+) -> None:
+    """Open ``connections`` pooled connections at once and run the hot
+    ``statements`` on each, so their statements are already prepared when
+    traffic arrives."""
+
+    async def warm_up_connection(conn: AsyncConnection) -> None:
+        for statement in statements:
+            await conn.execute(statement)
+
+    async with AsyncExitStack() as stack:
+        conns = await asyncio.gather(
+            *(
+                stack.enter_async_context(pool.engine.connect())
+                for _ in range(connections)
+            )
+        )
+        await asyncio.gather(*(warm_up_connection(conn) for conn in conns))
+    log.info(f"Warmed up {connections} database connections")
+
+
 def _create_async_engine(
     url: str, isolation_level: str = "AUTOCOMMIT"
 ) -> AsyncEngine:
@@ -60,6 +120,13 @@ def _create_async_engine(
         isolation_level=isolation_level,
         echo=DbSettings.echo,
         future=True,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=DbSettings.pool_size,
+        max_overflow=DbSettings.max_overflow,
+        pool_timeout=DbSettings.pool_timeout,
+        pool_recycle=DbSettings.pool_recycle,
+        pool_pre_ping=DbSettings.pool_pre_ping,
+        connect_args=DbSettings.get_connect_args(),
     )
 
 
@@ -79,27 +146,112 @@ def _create_async_sessionmaker(
     return async_sessionmaker(bind=engine, expire_on_commit=False, future=True)
 
 
-async def _create_connection() -> async_scoped_session[AsyncSession]:
-    current_pool = await get_async_pool(DbSettings.get_async_db_url())
-    ses = async_scoped_session(current_pool.maker, scopefunc=current_task)
-    return ses
-
-
 async def handle_session() -> AsyncGenerator[None, None]:
+    """Give the request a session that is only created when ``s.user_db``
+    is first used, and committed only if it holds unflushed changes."""
     try:
-        my_async_scoped_session = await _create_connection()
-        s.user_db = my_async_scoped_session()
+        current_pool = await get_async_pool(DbSettings.get_async_db_url())
     except Exception as exc:
         raise EngineCreationException("Can't connect to database") from exc
+
+    lazy_session = LazySession(maker=current_pool.maker)
+    user_db.set(lazy_session)
+    if (replica_pool := replica_router.choose()) is not None:
+        lazy_read_session = LazySession(maker=replica_pool.maker)
+    else:
+        lazy_read_session = lazy_session
+    read_db.set(lazy_read_session)
     try:
         yield
-        await s.user_db.commit()
+        if lazy_session.has_pending_changes():
+            await lazy_session.session.commit()
     except Exception as exc:
-        await s.user_db.rollback()
+        if lazy_session.session is not None:
+            await lazy_session.session.rollback()
         raise exc
     finally:
-        await s.user_db.close()
-        await my_async_scoped_session.remove()
+        if lazy_session.session is not None:
+            await lazy_session.session.close()
+        if (
+            lazy_read_session is not lazy_session
+            and lazy_read_session.session is not None
+        ):
+            await lazy_read_session.session.close()
+
+
+# Seconds the replica is behind the primary, 0 while it has replayed
+# everything it received so an idle primary does not look like lag.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE COALESCE(EXTRACT(EPOCH FROM "
+    "now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaRouter:
+    """Round robin over the read replicas whose replication lag was within
+    ``max_lag_seconds`` at the last check. Without healthy replicas reads
+    fall back to the primary."""
+
+    def __init__(self, urls: list[str], max_lag_seconds: float) -> None:
+        self.urls = urls
+        self.max_lag_seconds = max_lag_seconds
+        self._healthy: list[EnginePool] = []
+        self._next = 0
+        self.lags: dict[str, float | None] = dict.fromkeys(urls)
+
+    def choose(self) -> EnginePool | None:
+        if not self._healthy:
+            return None
+        self._next = (self._next + 1) % len(self._healthy)
+        return self._healthy[self._next]
+
+    async def _check_replica(self, url: str) -> EnginePool | None:
+        try:
+            pool = await get_async_pool(url)
+            async with pool.engine.connect() as conn:
+                lag = float(await conn.scalar(REPLICA_LAG_QUERY))
+        except Exception as exc:
+            log.warning(f"Read replica check failed: {exc!r}")
+            self.lags[url] = None
+            return None
+
+        self.lags[url] = lag
+        if lag > self.max_lag_seconds:
+            log.warning(f"Read replica lags {lag:.1f}s behind the primary")
+            return None
+        return pool
+
+    async def check(self) -> None:
+        pools = await asyncio.gather(
+            *(self._check_replica(url) for url in self.urls)
+        )
+        self._healthy = [pool for pool in pools if pool is not None]
+
+    async def monitor(self, interval_seconds: float) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "replicas": len(self.urls),
+            "healthy": len(self._healthy),
+        }
+
+
+replica_router = ReplicaRouter(
+    DbSettings.get_replica_db_urls(), DbSettings.replica_max_lag_seconds
+)
+
+
+def get_pool_stats() -> dict[str, dict[str, int | float]]:
+    stats = {}
+    for ses_pool in session_pools.values():
+        url = ses_pool.engine.url
+        if isinstance(pool := ses_pool.engine.pool, InstrumentedAsyncPool):
+            stats[f"{url.host}:{url.port}/{url.database}"] = pool.stats()
+    return stats
 
 
 async def close_dbs() -> None:
@@ -111,11 +263,19 @@ async def close_dbs() -> None:
 class Session:
     @property
     def user_db(self) -> AsyncSession:
-        return user_db.get()
+        return user_db.get().get()
 
     @user_db.setter
     def user_db(self, value: AsyncSession) -> None:
-        user_db.set(value)
+        lazy_session = LazySession(session=value)
+        user_db.set(lazy_session)
+        read_db.set(lazy_session)
+
+    @property
+    def read_db(self) -> AsyncSession:
+        """Session for read-only queries that tolerate replication lag,
+        bound to a read replica when one is healthy."""
+        return read_db.get().get()
 
 
 s = Session()
@@ -8,5 +8,7 @@ async def http_exception_handler(
     _: Request, exc: HTTPException
 ) -> ORJSONResponse:
     return ORJSONResponse(
-        status_code=exc.status_code, content={"detail": exc.detail}
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers=exc.headers,
     )
@@ -1,6 +1,7 @@
 import os
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 from dotenv import load_dotenv
 
@@ -32,6 +33,30 @@ class DbSettings:
 
     echo: bool = bool(os.environ["DB_ECHO"])
 
+    pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+    pool_pre_ping: bool = bool(int(os.getenv("DB_POOL_PRE_PING", "0")))
+    warm_up_connections: int = int(os.getenv("DB_WARM_UP_CONNECTIONS", "0"))
+
+    replica_hosts: str = os.getenv("DB_REPLICA_HOSTS", "")
+    replica_max_lag_seconds: float = float(
+        os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5")
+    )
+    replica_check_interval: float = float(
+        os.getenv("DB_REPLICA_CHECK_INTERVAL", "5")
+    )
+
+    statement_cache_size: int = int(
+        os.getenv("DB_STATEMENT_CACHE_SIZE", "100")
+    )
+    application_name: str = os.getenv("DB_APPLICATION_NAME", "fastapi-auth")
+    jit: str = os.getenv("DB_JIT", "")
+
+    fast_path: bool = bool(int(os.getenv("DB_FAST_PATH", "0")))
+    fast_path_pool_size: int = int(os.getenv("DB_FAST_PATH_POOL_SIZE", "10"))
+
     @classmethod
     def get_async_db_url(cls) -> str:
         return (
@@ -39,6 +64,13 @@ class DbSettings:
             f"{cls.db_host}:{cls.db_port}/{cls.db_name}"
         )
 
+    @classmethod
+    def get_asyncpg_dsn(cls) -> str:
+        return (
+            f"postgresql://{cls.db_user}:{cls.db_password}@"
+            f"{cls.db_host}:{cls.db_port}/{cls.db_name}"
+        )
+
     @classmethod
     def get_sync_db_url(cls) -> str:
         return (
@@ -46,6 +78,30 @@ class DbSettings:
             f"{cls.db_host}:{cls.db_port}/{cls.db_name}"
         )
 
+    @classmethod
+    def get_replica_db_urls(cls) -> list[str]:
+        """Replica URLs from ``DB_REPLICA_HOSTS`` given as
+        ``host:port,host:port``, sharing the primary credentials."""
+        urls = []
+        for host in filter(None, map(str.strip, cls.replica_hosts.split(","))):
+            host, _, port = host.partition(":")
+            urls.append(
+                f"{cls.async_db_engine}://{cls.db_user}:{cls.db_password}@"
+                f"{host}:{port or cls.db_port}/{cls.db_name}"
+            )
+        return urls
+
+    @classmethod
+    def get_connect_args(cls) -> dict[str, Any]:
+        """asyncpg connection arguments."""
+        server_settings = {"application_name": cls.application_name}
+        if cls.jit:
+            server_settings["jit"] = cls.jit
+        return {
+            "statement_cache_size": cls.statement_cache_size,
+            "server_settings": server_settings,
+        }
+
     @classmethod
     def get_postgres_db_url(cls) -> str:
         return (
@@ -68,11 +124,66 @@ class RedisSettings:
     host: str = os.environ["REDIS_HOST"]
     port: int = int(os.environ["REDIS_PORT"])
 
+    max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    pool_timeout: float = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+    socket_timeout: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2"))
+    socket_connect_timeout: float = float(
+        os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "2")
+    )
+    health_check_interval: int = int(
+        os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30")
+    )
+    retry_on_timeout: bool = bool(
+        int(os.getenv("REDIS_RETRY_ON_TIMEOUT", "1"))
+    )
+
     @classmethod
     def get_redis_url(cls) -> str:
         return f"redis://{cls.host}:{cls.port}"
 
 
+@dataclass
+class TokenCacheSettings:
+    enabled: bool = bool(int(os.getenv("TOKEN_CACHE_ENABLED", "1")))
+    max_size: int = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+    ttl_seconds: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "30"))
+    revocation_channel: str = os.getenv(
+        "TOKEN_CACHE_REVOCATION_CHANNEL", "token_revocations"
+    )
+
+
+@dataclass
+class UserCacheSettings:
+    REDIS_BACKEND: str = "redis"
+    MEMORY_BACKEND: str = "memory"
+    backend: str = os.getenv("USER_CACHE_BACKEND", REDIS_BACKEND)
+
+    enabled: bool = bool(int(os.getenv("USER_CACHE_ENABLED", "1")))
+    max_size: int = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+    local_ttl_seconds: float = float(
+        os.getenv("USER_CACHE_LOCAL_TTL_SECONDS", "5")
+    )
+    ttl_seconds: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+
+    VERSION_PREFIX: str = "user_version:"
+    RECORD_PREFIX: str = "user_record:"
+
+
+@dataclass
+class TokenStoreSettings:
+    REDIS_BACKEND: str = "redis"
+    MEMORY_BACKEND: str = "memory"
+    backend: str = os.getenv("TOKEN_STORE_BACKEND", REDIS_BACKEND)
+
+    TOKEN_PREFIX: str = "token:"
+    SESSIONS_PREFIX: str = "sessions:"
+    GENERATION_PREFIX: str = "token_gen:"
+    FAMILY_PREFIX: str = "token_family:"
+    FAMILY_REVOKED_PREFIX: str = "token_family_revoked:"
+    CONSUMED_PREFIX: str = "token_consumed:"
+    ROLE_VERSION_PREFIX: str = "role_version:"
+
+
 @dataclass
 class JWTSettings:
     ACCESS_TOKEN_TYPE: str = "Access"
@@ -80,8 +191,126 @@ class JWTSettings:
     ACCESS_TOKEN_EXPIRE_SECONDS: int = 15 * 60
     REFRESH_TOKEN_EXPIRE_SECONDS: int = 30 * 24 * 30 * 60
 
+    REDIS_VERIFICATION_MODE: str = "redis"
+    LOCAL_VERIFICATION_MODE: str = "local"
+    VERIFICATION_MODE: str = os.getenv(
+        "JWT_VERIFICATION_MODE", REDIS_VERIFICATION_MODE
+    )
+    REVOKED_TOKEN_PREFIX: str = "revoked:"
+
+
+@dataclass
+class IntrospectionSettings:
+    SECRET_HEADER: str = "X-Introspection-Secret"
+    secret: str = os.getenv("INTROSPECTION_SECRET", "")
+    max_tokens: int = int(os.getenv("INTROSPECTION_MAX_TOKENS", "500"))
+
+
+@dataclass
+class AuthCheckSettings:
+    USER_ID_HEADER: str = "X-User-Id"
+    USER_ROLE_HEADER: str = "X-User-Role"
+    cache_seconds: int = int(os.getenv("AUTH_CHECK_CACHE_SECONDS", "5"))
+
+
+@dataclass
+class PasswordHashSettings:
+    BCRYPT_SCHEME: str = "bcrypt"
+    ARGON2_SCHEME: str = "argon2"
+    scheme: str = os.getenv("PASSWORD_HASH_SCHEME", BCRYPT_SCHEME)
+    workers: int = int(
+        os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    argon2_time_cost: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    argon2_memory_cost: int = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+    argon2_parallelism: int = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    max_in_flight: int
+    max_queued: int
+    max_wait_seconds: float
+
+    @classmethod
+    def from_env(
+        cls,
+        route: str,
+        max_in_flight: int,
+        max_queued: int,
+        max_wait_seconds: float,
+    ) -> "AdmissionLimits":
+        prefix = f"ADMISSION_{route.upper()}"
+        return cls(
+            max_in_flight=int(
+                os.getenv(f"{prefix}_MAX_IN_FLIGHT", str(max_in_flight))
+            ),
+            max_queued=int(os.getenv(f"{prefix}_MAX_QUEUED", str(max_queued))),
+            max_wait_seconds=float(
+                os.getenv(f"{prefix}_MAX_WAIT_SECONDS", str(max_wait_seconds))
+            ),
+        )
+
+
+@dataclass
+class AdmissionSettings:
+    retry_after_seconds: int = int(
+        os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1")
+    )
+    login: AdmissionLimits = AdmissionLimits.from_env("login", 16, 64, 1.0)
+    signup: AdmissionLimits = AdmissionLimits.from_env("signup", 8, 32, 2.0)
+    change_password: AdmissionLimits = AdmissionLimits.from_env(
+        "change_password", 4, 16, 2.0
+    )
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    limit: int
+    window_seconds: int
+
+    @classmethod
+    def from_env(cls, name: str, default: str) -> "RateLimit":
+        """Parse ``RATE_LIMIT_<NAME>`` given as ``limit/window_seconds``."""
+        limit, _, window_seconds = os.getenv(
+            f"RATE_LIMIT_{name.upper()}", default
+        ).partition("/")
+        return cls(limit=int(limit), window_seconds=int(window_seconds))
+
+
+@dataclass
+class RateLimitSettings:
+    REDIS_BACKEND: str = "redis"
+    MEMORY_BACKEND: str = "memory"
+    backend: str = os.getenv("RATE_LIMIT_BACKEND", REDIS_BACKEND)
+    enabled: bool = bool(int(os.getenv("RATE_LIMIT_ENABLED", "1")))
+    trust_forwarded_for: bool = bool(
+        int(os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "0"))
+    )
+
+    PREFIX: str = "rate_limit:"
+    login_ip: RateLimit = RateLimit.from_env("login_ip", "30/60")
+    login_email: RateLimit = RateLimit.from_env("login_email", "5/60")
+    signup_ip: RateLimit = RateLimit.from_env("signup_ip", "10/3600")
+    signup_email: RateLimit = RateLimit.from_env("signup_email", "3/3600")
+
+
+@dataclass
+class BreachedPasswordSettings:
+    bloom_filter_path: str = os.getenv("BREACHED_PASSWORDS_BLOOM_PATH", "")
+    false_positive_rate: float = float(
+        os.getenv("BREACHED_PASSWORDS_FALSE_POSITIVE_RATE", "0.001")
+    )
+
 
 @dataclass
 class SecuritySettings:
     ALGORITHM: str = os.environ["SECURITY_ALGORITHM"]
     SECRET_KEY: str = os.environ["SECRET_KEY"]
+
+    SIGNING_KEY_ID: str = os.getenv("SIGNING_KEY_ID", "default")
+    SIGNING_PRIVATE_KEY_PATH: str = os.getenv("SIGNING_PRIVATE_KEY_PATH", "")
+    RETIRED_PUBLIC_KEY_PATHS: str = os.getenv("RETIRED_PUBLIC_KEY_PATHS", "")
+    JWKS_MAX_AGE_SECONDS: int = int(os.getenv("JWKS_MAX_AGE_SECONDS", "3600"))
@@ -1,3 +1,4 @@
+import pytest
 import pytest_asyncio
 
 from src.db.session import close_dbs, get_async_pool
@@ -5,6 +6,24 @@ from src.db.utils import create_db, create_tables, drop_db, drop_tables
 from src.settings import DbSettings
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--query-plans",
+        action="store_true",
+        help="Run the EXPLAIN tests, they seed a million users",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--query-plans"):
+        return
+
+    skip = pytest.mark.skip(reason="needs --query-plans")
+    for item in items:
+        if "query_plans" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest_asyncio.fixture()
 async def connect_db():
     await create_db(DbSettings.get_postgres_db_url(), DbSettings.db_name)
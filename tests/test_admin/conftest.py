@@ -9,9 +9,13 @@ import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 
 from src.api.routers import api_router_v1
-from src.api.v1.admin.dependencies import check_admin_role
+from src.api.v1.admin.dependencies import (
+    check_admin_role,
+    check_metrics_permission,
+)
 from src.api.v1.users.dependencies import get_current_user
 from src.api.v1.users.utils.password import hash_password
+from src.api.v1.users.utils.principal import AuthPrincipal
 from src.db.models import User
 from src.db.session import get_async_pool, s
 from src.settings import DbSettings
@@ -61,10 +65,13 @@ async def async_test_admin_client(
         admin user"""
         test_admin = test_admin_user
         s.user_db.add(test_admin)
-        return test_admin
+        return AuthPrincipal.from_user(test_admin)
 
     my_app.dependency_overrides[get_current_user] = override_get_current_user
     my_app.dependency_overrides[check_admin_role] = mock_check_admin_role
+    my_app.dependency_overrides[check_metrics_permission] = (
+        mock_check_admin_role
+    )
 
     async with AsyncClient(
         transport=ASGITransport(app=my_app), base_url="http://test"
@@ -0,0 +1,139 @@
+from typing import Any, Iterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+import orjson
+import pytest
+
+from src.api.v1.admin.crud import filtered_users_query
+from src.api.v1.admin.models.admin_query_params import AdminQueryParams
+from src.db.session import get_async_pool
+from src.settings import DbSettings
+
+SEED_USERS = 1_000_000
+
+# Inactive, blocked and deleted users are rare, as in production.
+SEED_USERS_QUERY = text(
+    "INSERT INTO users (email, password, first_name, last_name, role, "
+    "balance, is_active, is_blocked, is_deleted, created_at, updated_at) "
+    "SELECT 'user_' || i || '@example.com', 'password', "
+    "'first_' || i % 5000, 'last_' || i % 7000, 'user', "
+    "(i * 7919) % 100000, i % 1000 <> 0, i % 2000 = 1, i % 5000 = 2, "
+    "now(), now() - (i % 100000) * interval '1 minute' "
+    "FROM generate_series(1, :users) AS i"
+)
+
+DEFAULT_PARAMS = {
+    "user_id": None,
+    "email": None,
+    "first_name": None,
+    "last_name": None,
+    "is_active": None,
+    "is_blocked": None,
+    "is_deleted": None,
+    "order_by": None,
+    "order_type": "asc",
+    "limit": None,
+    "offset": 0,
+}
+
+# Query params and the index expected to serve them.
+INDEXED_QUERIES = [
+    ({"user_id": 4242}, "users_pkey"),
+    ({"email": "user_4242@example.com"}, "users_email_key"),
+    ({"first_name": "first_42"}, "ix_users_first_name"),
+    ({"last_name": "last_42"}, "ix_users_last_name"),
+    ({"is_active": False}, "ix_users_inactive"),
+    ({"is_blocked": True}, "ix_users_blocked"),
+    ({"is_deleted": True}, "ix_users_deleted"),
+    ({"order_by": "id", "order_type": "asc"}, "users_pkey"),
+    ({"order_by": "id", "order_type": "desc"}, "users_pkey"),
+    ({"order_by": "balance", "order_type": "asc"}, "ix_users_balance"),
+    ({"order_by": "balance", "order_type": "desc"}, "ix_users_balance"),
+    ({"order_by": "updated_at", "order_type": "asc"}, "ix_users_updated_at"),
+    ({"order_by": "updated_at", "order_type": "desc"}, "ix_users_updated_at"),
+    # The common side of a flag matches nearly every row, walking the order
+    # index and filtering stops after the first page.
+    ({"is_active": True, "order_by": "updated_at"}, "ix_users_updated_at"),
+    ({"is_blocked": False, "order_by": "balance"}, "ix_users_balance"),
+    # The rare side of a flag and a name match a few hundred rows at most,
+    # the selective index finds them and sorting them is cheaper than
+    # maintaining a composite index per filter and order.
+    ({"is_blocked": True, "order_by": "balance"}, "ix_users_blocked"),
+    ({"is_deleted": True, "order_by": "updated_at"}, "ix_users_deleted"),
+    ({"last_name": "last_42", "order_by": "balance"}, "ix_users_last_name"),
+    ({"first_name": "first_42", "is_active": True}, "ix_users_first_name"),
+]
+
+# Unordered listings of the common side of the flags stop after the first
+# page of a sequential scan, an index would not help them.
+SCAN_QUERIES = [
+    {},
+    {"is_active": True},
+    {"is_blocked": False},
+    {"is_deleted": False},
+]
+
+INDEX_NODE_TYPES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def plan_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def explain(conn: AsyncConnection, params: dict) -> dict[str, Any]:
+    query = filtered_users_query(
+        AdminQueryParams(**{**DEFAULT_PARAMS, "limit": 100, **params})
+    )
+    compiled = query.compile(
+        dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = await conn.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    return orjson.loads(plan)[0]["Plan"]
+
+
+@pytest.mark.query_plans
+@pytest.mark.asyncio
+async def test_admin_user_listing_query_plans(connect_db):
+    current_pool = await get_async_pool(DbSettings.get_async_db_url())
+    async with current_pool.engine.connect() as conn:
+        await conn.execute(SEED_USERS_QUERY, {"users": SEED_USERS})
+        await conn.execute(text("ANALYZE users"))
+
+        failures = []
+        for params, expected_index in INDEXED_QUERIES:
+            nodes = list(plan_nodes(await explain(conn, params)))
+            indexes = {
+                node.get("Index Name")
+                for node in nodes
+                if node["Node Type"] in INDEX_NODE_TYPES
+            }
+            seq_scans = [n for n in nodes if n["Node Type"] == "Seq Scan"]
+            if seq_scans or not indexes:
+                failures.append(f"{params}: no index used")
+            elif expected_index not in indexes:
+                failures.append(f"{params}: {indexes} used")
+
+        for params in SCAN_QUERIES:
+            plan = await explain(conn, params)
+            node_types = {node["Node Type"] for node in plan_nodes(plan)}
+            if plan["Node Type"] != "Limit" or "Sort" in node_types:
+                failures.append(f"{params}: full scan")
+
+    assert not failures, "\n".join(failures)
+
+
+def test_is_deleted_filters_deleted_users():
+    params = {**DEFAULT_PARAMS, "is_deleted": True}
+    query = filtered_users_query(AdminQueryParams(**params))
+
+    assert str(query.whereclause) == "users.is_deleted"
+
+
+def test_user_listing_is_unbounded_by_default():
+    query = filtered_users_query(AdminQueryParams(**DEFAULT_PARAMS))
+
+    assert "LIMIT" not in str(query) and "OFFSET" not in str(query)
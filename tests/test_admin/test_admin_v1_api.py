@@ -5,10 +5,15 @@ from httpx import AsyncClient
 
 from src.api.exceptions import (
     ADMIN_BLOCK_ITSELF_EXCEPTION,
+    ADMIN_CHANGE_OWN_ROLE_EXCEPTION,
     ALREADY_BLOCKED_EXCEPTION,
     NOT_BLOCKED_EXCEPTION,
 )
-from src.api.v1.users.models.user import BlockUserSchema, UserResponseSchema
+from src.api.v1.users.models.user import (
+    BlockUserSchema,
+    UserResponseSchema,
+    UserRoleSchema,
+)
 from src.db.models import User
 from src.db.session import s
 from tests.test_admin.conftest import TEST_BLOCKED_USER_EMAIL, TEST_USER_EMAIL
@@ -53,6 +58,35 @@ async def test_get_users(
     assert UserResponseSchema.model_validate(response.json()["users"][0])
 
 
+@pytest.mark.asyncio
+async def test_get_users_pages(
+    async_test_admin_client: AsyncClient,
+    test_user: User,
+    test_blocked_user: User,
+):
+    url = f"{ADMIN_API_V1}/users/"
+    order = {"order_by": "id", "order_type": "asc"}
+
+    response = await async_test_admin_client.get(url, params=order)
+    user_ids = [user["id"] for user in response.json()["users"]]
+    assert len(user_ids) == 3
+
+    first_page = await async_test_admin_client.get(
+        url, params={**order, "limit": 2}
+    )
+    second_page = await async_test_admin_client.get(
+        url, params={**order, "limit": 2, "offset": 2}
+    )
+    assert [
+        user["id"]
+        for page in (first_page, second_page)
+        for user in page.json()["users"]
+    ] == user_ids
+
+    response = await async_test_admin_client.get(url, params={"limit": 0})
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_block_user(
     async_test_admin_client: AsyncClient, test_user: User
@@ -126,3 +160,50 @@ async def test_unblock_not_blocked_user(
     )
     assert response.status_code == NOT_BLOCKED_EXCEPTION.status_code
     assert response.json()["detail"] == NOT_BLOCKED_EXCEPTION.detail
+
+
+@pytest.mark.asyncio
+async def test_change_role(
+    async_test_admin_client: AsyncClient, test_user: User
+):
+    response = await async_test_admin_client.patch(
+        f"{ADMIN_API_V1}/role/{test_user.id}/", json={"role": "admin"}
+    )
+    assert response.status_code == 200
+    assert UserRoleSchema.model_validate(response.json()).role == "admin"
+
+    my_test_user = await s.user_db.scalar(
+        select(User).filter(User.email == TEST_USER_EMAIL)
+    )
+    assert my_test_user.role == "admin"
+
+
+@pytest.mark.asyncio
+async def test_admin_change_own_role(
+    async_test_admin_client: AsyncClient, test_admin_user: User
+):
+    response = await async_test_admin_client.patch(
+        f"{ADMIN_API_V1}/role/{test_admin_user.id}/", json={"role": "user"}
+    )
+    assert response.status_code == ADMIN_CHANGE_OWN_ROLE_EXCEPTION.status_code
+    assert response.json()["detail"] == ADMIN_CHANGE_OWN_ROLE_EXCEPTION.detail
+
+
+@pytest.mark.asyncio
+async def test_get_metrics(async_test_admin_client: AsyncClient):
+    response = await async_test_admin_client.get(f"{ADMIN_API_V1}/metrics/")
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions"} <= set(
+        response.json()["token_cache"]
+    )
+    assert {"queued", "running", "wait_ms_avg"} <= set(
+        response.json()["password_hasher"]
+    )
+    assert {"local_hits", "shared_hits", "invalidations"} <= set(
+        response.json()["user_cache"]
+    )
+    assert response.json()["admission"]["login"]["shed"] == 0
+    assert all(
+        {"checked_out", "overflow", "waiters", "wait_ms_avg"} <= set(stats)
+        for stats in response.json()["db_pools"].values()
+    )
@@ -0,0 +1,165 @@
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.api.v1.auth import routes as auth_routes
+from src.api.v1.auth.routes import router as auth_router
+from src.api.v1.users.dependencies import get_token_store
+from src.api.v1.users.utils.my_jwt import create_jwt
+from src.api.v1.users.utils.token_store import InMemoryTokenStore
+from src.settings import (
+    AuthCheckSettings,
+    IntrospectionSettings,
+    JWTSettings,
+)
+
+CHECK_URL = "/auth/check/"
+INTROSPECT_URL = "/auth/introspect/"
+SECRET_HEADERS = {
+    IntrospectionSettings.SECRET_HEADER: IntrospectionSettings.secret
+}
+
+
+@pytest.fixture()
+def token_store() -> InMemoryTokenStore:
+    return InMemoryTokenStore()
+
+
+@pytest.fixture()
+def app(token_store: InMemoryTokenStore) -> FastAPI:
+    my_app = FastAPI()
+    my_app.include_router(auth_router)
+    my_app.dependency_overrides[get_token_store] = lambda: token_store
+    return my_app
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "verification_mode",
+    [JWTSettings.REDIS_VERIFICATION_MODE, JWTSettings.LOCAL_VERIFICATION_MODE],
+)
+async def test_introspect(app, token_store, monkeypatch, verification_mode):
+    monkeypatch.setattr(JWTSettings, "VERIFICATION_MODE", verification_mode)
+    claims = {"sub": "user@gmail.com", "id": 1, "sid": "session"}
+    active = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, claims, 60)
+    revoked = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, claims, 60)
+    await token_store.save(active, revoked)
+    await token_store.revoke(*revoked)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            INTROSPECT_URL,
+            json={"tokens": [active[0], revoked[0], "not-a-token"]},
+            headers=SECRET_HEADERS,
+        )
+
+    assert response.status_code == 200
+    active_result, revoked_result, invalid_result = response.json()["tokens"]
+    assert active_result == {
+        "active": True,
+        "token_type": JWTSettings.ACCESS_TOKEN_TYPE,
+        "sub": "user@gmail.com",
+        "user_id": 1,
+        "sid": "session",
+        "exp": active[1]["exp"],
+        "iat": active[1]["iat"],
+        "jti": active[1]["jti"],
+    }
+    assert revoked_result == {"active": False}
+    assert invalid_result == {"active": False}
+
+
+@pytest.mark.asyncio
+async def test_introspect_requires_secret(app):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            INTROSPECT_URL,
+            json={"tokens": ["token"]},
+            headers={IntrospectionSettings.SECRET_HEADER: "wrong"},
+        )
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_check(app, token_store):
+    claims = {"sub": "user@gmail.com", "id": 1, "role": "admin", "rv": 0}
+    token, payload = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, claims, 60)
+    await token_store.save((token, payload))
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(
+            CHECK_URL, headers={"Authorization": f"Bearer {token}"}
+        )
+        await token_store.revoke(token, payload)
+        revoked_response = await client.get(
+            CHECK_URL, headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert response.status_code == 204
+    assert response.content == b""
+    assert response.headers[AuthCheckSettings.USER_ID_HEADER] == "1"
+    assert response.headers[AuthCheckSettings.USER_ROLE_HEADER] == "admin"
+    assert response.headers["Cache-Control"] == (
+        f"private, max-age={AuthCheckSettings.cache_seconds}"
+    )
+    assert revoked_response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_check_reloads_role_after_role_change(
+    app, token_store, monkeypatch
+):
+    async def get_user(email):
+        return SimpleNamespace(id=1, role="user")
+
+    monkeypatch.setattr(auth_routes, "get_read_only_user_by_email", get_user)
+    claims = {"sub": "user@gmail.com", "id": 1, "role": "admin", "rv": 0}
+    token, payload = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, claims, 60)
+    await token_store.save((token, payload))
+    await token_store.set_role_version(1, 1)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(
+            CHECK_URL, headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert response.status_code == 204
+    assert response.headers[AuthCheckSettings.USER_ROLE_HEADER] == "user"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "verification_mode",
+    [JWTSettings.REDIS_VERIFICATION_MODE, JWTSettings.LOCAL_VERIFICATION_MODE],
+)
+async def test_check_rejects_bad_tokens_with_401(
+    app, token_store, monkeypatch, verification_mode
+):
+    monkeypatch.setattr(JWTSettings, "VERIFICATION_MODE", verification_mode)
+    claims = {"sub": "user@gmail.com", "id": 1, "role": "user"}
+    expired = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, claims, -60)
+    refresh = create_jwt(JWTSettings.REFRESH_TOKEN_TYPE, claims, 60)
+    await token_store.save(refresh)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        for token in ("not-a-token", expired[0], refresh[0]):
+            response = await client.get(
+                CHECK_URL, headers={"Authorization": f"Bearer {token}"}
+            )
+
+            assert response.status_code == 401, token
+            assert response.headers["WWW-Authenticate"] == "Bearer"
@@ -9,8 +9,9 @@ import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 
 from src.api.routers import api_router_v1
-from src.api.v1.users.dependencies import get_current_user
+from src.api.v1.users.dependencies import get_current_user_fresh
 from src.api.v1.users.utils.password import hash_password
+from src.api.v1.users.utils.principal import AuthPrincipal
 from src.db.models import User
 from src.db.session import get_async_pool, s
 from src.settings import DbSettings
@@ -56,9 +57,11 @@ async def async_test_balance_client(
         """Overridden get_current_user dependency which return test user"""
         test_user = test_user_with_balance
         s.user_db.add(test_user)
-        return test_user
+        return AuthPrincipal.from_user(test_user)
 
-    my_app.dependency_overrides[get_current_user] = override_get_current_user
+    my_app.dependency_overrides[get_current_user_fresh] = (
+        override_get_current_user
+    )
 
     async with AsyncClient(
         transport=ASGITransport(app=my_app), base_url="http://test"
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+
+from src.api.v1.users import fast_crud
+from src.api.v1.users.models.user import UserResponseSchema
+from src.api.v1.users.utils.principal import PRINCIPAL_FIELDS, AuthPrincipal
+from src.db.fast_path import FastPathPool
+
+NOW = datetime(2024, 1, 1)
+USER_ROW = (1, "user@gmail.com", "Name", "Last", "user", 10)
+USER_ROW += (True, False, False, NOW, NOW)
+
+
+class MockConnection:
+    def __init__(self):
+        self.prepared = {}
+
+    async def prepare(self, query, name=None):
+        self.prepared[name] = query
+        return query
+
+
+@pytest.mark.asyncio
+async def test_statements_are_prepared_by_name():
+    pool = FastPathPool({"one": "SELECT 1"}, dsn="postgresql://")
+    conn = MockConnection()
+
+    await pool._prepare_statements(conn)
+
+    assert conn.prepared == {"fast_path_one": "SELECT 1"}
+    assert conn.statements == {"one": "SELECT 1"}
+
+
+def test_fast_path_principal_matches_user_response_schema():
+    principal = AuthPrincipal(*USER_ROW)
+
+    assert "password" not in PRINCIPAL_FIELDS
+    assert fast_crud.SELECT_USER.startswith("SELECT id, email, first_name")
+    schema = UserResponseSchema.model_validate(principal)
+    assert (schema.id, schema.email, schema.balance) == (
+        1,
+        "user@gmail.com",
+        10,
+    )
+
+
+@pytest.mark.asyncio
+async def test_lookups_return_records(monkeypatch):
+    rows = {("user_by_email", "user@gmail.com"): USER_ROW}
+
+    async def fetchrow(name, *args):
+        return rows.get((name, *args))
+
+    monkeypatch.setattr(fast_crud.user_fast_path, "fetchrow", fetchrow)
+
+    user = await fast_crud.get_user_by_email("user@gmail.com")
+    assert (user.id, user.role, str(user)) == (1, "user", "user@gmail.com")
+    assert await fast_crud.get_user_by_email("missing@gmail.com") is None
+    assert await fast_crud.get_user_by_id(1) is None
@@ -0,0 +1,50 @@
+import time
+from unittest.mock import MagicMock
+
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+import pytest
+
+from src.db.pool import InstrumentedAsyncPool
+
+
+def test_instrumented_pool_stats():
+    pool = InstrumentedAsyncPool(MagicMock, pool_size=1, max_overflow=1)
+
+    first, second = pool.connect(), pool.connect()
+    stats = pool.stats()
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["waiters"] == 0
+    assert stats["checkouts"] == 2
+
+    first.close()
+    second.close()
+    assert pool.stats()["checked_out"] == 0
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_wait_excludes_connect_and_failures():
+    def slow_connect():
+        time.sleep(0.05)
+        return MagicMock()
+
+    pool = InstrumentedAsyncPool(
+        slow_connect, pool_size=1, max_overflow=0, timeout=0.01
+    )
+
+    def check_out():
+        connection = pool.connect()
+        with pytest.raises(TimeoutError):
+            pool.connect()
+        connection.close()
+        pool.connect().close()
+
+    # Blocking checkouts of the async pool run in a greenlet.
+    await greenlet_spawn(check_out)
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["checkout_failures"] == 1
+    assert stats["wait_ms_max"] < 50
@@ -0,0 +1,149 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.db import session as db_session
+from src.db.session import (
+    EnginePool,
+    ReplicaRouter,
+    handle_session,
+    replica_router,
+    s,
+)
+
+
+class MockSession:
+    def __init__(self):
+        self.new, self.dirty, self.deleted = set(), set(), set()
+        self.commits = 0
+        self.closed = False
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture()
+def sessions(monkeypatch):
+    created = []
+
+    def maker():
+        created.append(MockSession())
+        return created[-1]
+
+    async def get_async_pool(db_url):
+        return EnginePool(engine=None, maker=maker)
+
+    monkeypatch.setattr(db_session, "get_async_pool", get_async_pool)
+    return created
+
+
+async def run_request(handler) -> None:
+    dependency = handle_session()
+    await anext(dependency)
+    handler()
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+
+
+@pytest.mark.asyncio
+async def test_handle_session_is_lazy(sessions):
+    await run_request(lambda: None)
+    assert sessions == []
+
+
+@pytest.mark.asyncio
+async def test_handle_session_commits_pending_changes_only(sessions):
+    await run_request(lambda: s.user_db)
+    await run_request(lambda: s.user_db.new.add(object()))
+
+    read_only, writing = sessions
+    assert (read_only.commits, writing.commits) == (0, 1)
+    assert read_only.closed and writing.closed
+
+
+@pytest.mark.asyncio
+async def test_get_async_pool_creates_engine_once(monkeypatch):
+    created = []
+
+    def create_engine(url):
+        created.append(url)
+        return MagicMock()
+
+    async def check_connection(engine):
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(db_session, "session_pools", {})
+    monkeypatch.setattr(db_session, "_create_async_engine", create_engine)
+    monkeypatch.setattr(db_session, "_check_connection", check_connection)
+
+    pools = await asyncio.gather(
+        *(db_session.get_async_pool("postgresql://test") for _ in range(5))
+    )
+
+    assert created == ["postgresql://test"]
+    assert all(pool is pools[0] for pool in pools)
+
+
+def test_get_async_pool_lock_works_across_loops(monkeypatch):
+    async def check_connection(engine):
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(db_session, "_create_async_engine", MagicMock)
+    monkeypatch.setattr(db_session, "_check_connection", check_connection)
+
+    async def get_pools(db_url):
+        return await asyncio.gather(
+            *(db_session.get_async_pool(db_url) for _ in range(2))
+        )
+
+    for db_url in ("postgresql://first", "postgresql://second"):
+        monkeypatch.setattr(db_session, "session_pools", {})
+        pools = asyncio.run(get_pools(db_url))
+        assert pools[0] is pools[1]
+
+
+@pytest.mark.asyncio
+async def test_handle_session_routes_reads_to_replica(sessions, monkeypatch):
+    replica_sessions = []
+
+    def replica_maker():
+        replica_sessions.append(MockSession())
+        return replica_sessions[-1]
+
+    replica_pool = EnginePool(engine=None, maker=replica_maker)
+    monkeypatch.setattr(replica_router, "_healthy", [replica_pool])
+
+    await run_request(lambda: (s.read_db, s.user_db))
+    monkeypatch.setattr(replica_router, "_healthy", [])
+    await run_request(lambda: s.read_db)
+
+    assert len(replica_sessions) == 1 and replica_sessions[0].closed
+    assert len(sessions) == 2
+
+
+@pytest.mark.asyncio
+async def test_replica_router_skips_lagging_replicas(monkeypatch):
+    lags = {"postgresql://fresh": 0.5, "postgresql://stale": 30.0}
+
+    async def get_async_pool(url):
+        conn = MagicMock()
+        conn.scalar = AsyncMock(return_value=lags[url])
+        engine = MagicMock()
+        engine.connect.return_value.__aenter__.return_value = conn
+        return EnginePool(engine=engine, maker=url)
+
+    monkeypatch.setattr(db_session, "get_async_pool", get_async_pool)
+    router = ReplicaRouter(list(lags), max_lag_seconds=5)
+
+    assert router.choose() is None
+    await router.check()
+
+    assert {router.choose().maker for _ in range(3)} == {"postgresql://fresh"}
+    assert router.lags == lags
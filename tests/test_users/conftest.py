@@ -11,10 +11,13 @@ from httpx import ASGITransport, AsyncClient
 from src.api.routers import api_router_v1
 from src.api.v1.users.dependencies import (
     get_current_user,
+    get_current_user_fresh,
+    get_current_user_read_only,
     get_redis_client,
     get_user_from_refresh_token,
 )
 from src.api.v1.users.utils.password import hash_password
+from src.api.v1.users.utils.principal import AuthPrincipal
 from src.db.models import User
 from src.db.session import get_async_pool, s
 from src.settings import DbSettings
@@ -65,13 +68,19 @@ async def async_test_client(
         """Overridden get_current_user dependency which return test user"""
         mock_user = test_mock_user
         s.user_db.add(mock_user)
-        return mock_user
+        return AuthPrincipal.from_user(mock_user)
 
     my_app.dependency_overrides[get_redis_client] = get_mock_redis_client
     my_app.dependency_overrides[get_user_from_refresh_token] = (
         override_get_current_user
     )
     my_app.dependency_overrides[get_current_user] = override_get_current_user
+    my_app.dependency_overrides[get_current_user_fresh] = (
+        override_get_current_user
+    )
+    my_app.dependency_overrides[get_current_user_read_only] = (
+        override_get_current_user
+    )
 
     async with AsyncClient(
         transport=ASGITransport(app=my_app), base_url="http://test"
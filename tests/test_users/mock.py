@@ -1,13 +1,93 @@
 class MockRedisClient:
     def __init__(self):
         self.store = {}
+        self.ttls = {}
 
     async def set(self, name, value, ex=None):
         self.store[name] = value
+        if ex is None:
+            self.ttls.pop(name, None)
+        else:
+            self.ttls[name] = ex
 
     async def get(self, name):
         return self.store.get(name)
 
+    async def delete(self, *names):
+        for name in names:
+            self.ttls.pop(name, None)
+        return sum(self.store.pop(name, None) is not None for name in names)
+
+    async def exists(self, *names):
+        return sum(name in self.store for name in names)
+
+    async def publish(self, channel, message):
+        return 0
+
+    async def zadd(self, name, mapping, gt=False):
+        members = self.store.setdefault(name, {})
+        for member, score in mapping.items():
+            if not gt or score > members.get(member, score - 1):
+                members[member] = score
+
+    async def zrem(self, name, *members):
+        removed = sum(
+            self.store.get(name, {}).pop(member, None) is not None
+            for member in members
+        )
+        if name in self.store and not self.store[name]:
+            await self.delete(name)
+        return removed
+
+    async def expire(self, name, time, nx=False, gt=False):
+        # As in Redis a key without a TTL counts as never expiring for gt.
+        if name not in self.store:
+            return False
+        current = self.ttls.get(name)
+        if nx and current is not None:
+            return False
+        if gt and (current is None or time <= current):
+            return False
+        self.ttls[name] = time
+        return True
+
+    async def ttl(self, name):
+        if name not in self.store:
+            return -2
+        return self.ttls.get(name, -1)
+
+    def pipeline(self, transaction=True):
+        return MockRedisPipeline(self)
+
+    def register_script(self, script):
+        return None
+
+
+class MockRedisPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands.clear()
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        commands, self.commands = self.commands, []
+        return [
+            await method(*args, **kwargs) for method, args, kwargs in commands
+        ]
+
 
 mock_redis_client = MockRedisClient()
 
@@ -0,0 +1,67 @@
+import asyncio
+
+from fastapi import HTTPException
+
+import pytest
+
+from src.api.exceptions import SERVICE_OVERLOADED_EXCEPTION
+from src.api.v1.users.utils.admission import AdmissionController
+from src.settings import AdmissionLimits
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_sheds_overflow():
+    controller = AdmissionController(
+        "test",
+        AdmissionLimits(max_in_flight=1, max_queued=1, max_wait_seconds=0.05),
+    )
+    release = asyncio.Event()
+
+    async def hold_slot():
+        async with controller.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        async with controller.admit():
+            pass
+    assert exc_info.value is SERVICE_OVERLOADED_EXCEPTION
+    assert "Retry-After" in exc_info.value.headers
+
+    with pytest.raises(HTTPException):
+        await waiter
+
+    release.set()
+    await holder
+    async with controller.admit():
+        pass
+
+    assert controller.stats() == {
+        "in_flight": 0,
+        "queued": 0,
+        "admitted": 2,
+        "shed": 2,
+    }
+
+
+def test_admission_controller_works_across_loops():
+    controller = AdmissionController(
+        "test",
+        AdmissionLimits(max_in_flight=1, max_queued=1, max_wait_seconds=1),
+    )
+
+    async def contend():
+        async def hold_slot():
+            async with controller.admit():
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(hold_slot(), hold_slot())
+
+    asyncio.run(contend())
+    asyncio.run(contend())
+
+    assert controller.stats()["admitted"] == 4
@@ -0,0 +1,61 @@
+import hashlib
+
+import pytest
+
+from src.api.v1.users.utils import breached_passwords
+from src.api.v1.users.utils.breached_passwords import (
+    BloomFilter,
+    build_breached_password_filter,
+    sha1_digest,
+)
+from src.api.v1.users.utils.password import validate_password
+from src.settings import BreachedPasswordSettings
+
+BREACHED_PASSWORD = "Breached_password1"
+
+
+@pytest.fixture()
+def bloom_filter_path(tmp_path, monkeypatch):
+    hashes_path = tmp_path / "hashes.txt"
+    lines = [
+        f"{hashlib.sha1(f'password{i}'.encode()).hexdigest().upper()}:{i}"
+        for i in range(1000)
+    ]
+    lines.append(f"{sha1_digest(BREACHED_PASSWORD).hex().upper()}:42")
+    hashes_path.write_text("\n".join(lines))
+
+    output_path = tmp_path / "breached.bloom"
+    assert build_breached_password_filter(hashes_path, output_path, 0.001)
+
+    monkeypatch.setattr(
+        BreachedPasswordSettings, "bloom_filter_path", str(output_path)
+    )
+    breached_passwords.get_breached_password_filter.cache_clear()
+    yield output_path
+    breached_passwords.get_breached_password_filter.cache_clear()
+
+
+def test_bloom_filter_lookup(bloom_filter_path):
+    bloom_filter = BloomFilter.open(bloom_filter_path)
+
+    assert sha1_digest(BREACHED_PASSWORD) in bloom_filter
+    assert sha1_digest("password7") in bloom_filter
+    false_positives = sum(
+        sha1_digest(f"other{i}") in bloom_filter for i in range(1000)
+    )
+    assert false_positives < 10
+
+
+def test_validate_password_rejects_breached_password(bloom_filter_path):
+    assert validate_password("Fresh_password1") == "Fresh_password1"
+    with pytest.raises(ValueError, match="data breach"):
+        validate_password(BREACHED_PASSWORD)
+
+
+def test_bloom_filter_rejects_corrupt_file(tmp_path):
+    for content in (b"", b"not a bloom filter", b"x" * 64):
+        path = tmp_path / "corrupt.bloom"
+        path.write_bytes(content)
+
+        with pytest.raises(ValueError, match="not a breached password"):
+            BloomFilter.open(path)
@@ -0,0 +1,106 @@
+from fastapi import FastAPI
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+)
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+)
+from httpx import ASGITransport, AsyncClient
+
+from src.api.v1.users.utils import keys
+from src.api.v1.users.utils.my_jwt import create_jwt, verify_jwt
+from src.api.well_known import routes as well_known
+from src.settings import SecuritySettings
+
+
+def write_key_pair(tmp_path, name: str) -> tuple[str, str]:
+    private_key = Ed25519PrivateKey.generate()
+    private_path = tmp_path / f"{name}.pem"
+    public_path = tmp_path / f"{name}.pub.pem"
+    private_path.write_bytes(
+        private_key.private_bytes(
+            Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()
+        )
+    )
+    public_path.write_bytes(
+        private_key.public_key().public_bytes(
+            Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+        )
+    )
+    return str(private_path), str(public_path)
+
+
+@pytest.fixture()
+def eddsa_key_ring(tmp_path, monkeypatch):
+    old_private, old_public = write_key_pair(tmp_path, "old")
+    new_private, _ = write_key_pair(tmp_path, "new")
+
+    monkeypatch.setattr(SecuritySettings, "ALGORITHM", "EdDSA")
+    monkeypatch.setattr(SecuritySettings, "SIGNING_KEY_ID", "new")
+    monkeypatch.setattr(
+        SecuritySettings, "SIGNING_PRIVATE_KEY_PATH", new_private
+    )
+    monkeypatch.setattr(
+        SecuritySettings, "RETIRED_PUBLIC_KEY_PATHS", f"old={old_public}"
+    )
+    keys.get_key_ring.cache_clear()
+    monkeypatch.setattr(well_known, "jwks_document", None)
+
+    yield keys.get_key_ring(), keys.load_signing_key(
+        "old", "EdDSA", old_private
+    )
+
+    keys.get_key_ring.cache_clear()
+
+
+def test_key_ring_verifies_retired_keys(eddsa_key_ring):
+    key_ring, old_key = eddsa_key_ring
+    old_token = jwt.encode(
+        {"sub": "user"},
+        old_key.signing_key,
+        algorithm="EdDSA",
+        headers={"kid": "old"},
+    )
+
+    verification_key = key_ring.get(
+        jwt.get_unverified_header(old_token)["kid"]
+    )
+    payload = jwt.decode(
+        old_token,
+        verification_key.verification_key,
+        algorithms=[verification_key.algorithm],
+    )
+
+    assert payload == {"sub": "user"}
+
+    token, token_payload = create_jwt("Access", {"sub": "user"}, 60)
+    assert jwt.get_unverified_header(token)["kid"] == "new"
+    assert verify_jwt(token) == token_payload
+    with pytest.raises(jwt.InvalidTokenError):
+        key_ring.get("unknown")
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint(eddsa_key_ring):
+    app = FastAPI()
+    app.include_router(well_known.router)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/.well-known/jwks.json")
+        cached_response = await client.get(
+            "/.well-known/jwks.json",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+
+    assert response.status_code == 200
+    assert "max-age" in response.headers["Cache-Control"]
+    assert {key["kid"] for key in response.json()["keys"]} == {"new", "old"}
+    assert cached_response.status_code == 304
@@ -0,0 +1,76 @@
+from fastapi import HTTPException
+
+import jwt
+import pytest
+
+from src.api.exceptions import UNABLE_DECODE_JWT_EXCEPTION
+from src.api.v1.users.dependencies import _verify_token
+from src.api.v1.users.utils.keys import get_key_ring
+from src.api.v1.users.utils.my_jwt import (
+    create_jwt,
+    decode_jwt,
+    encode_jwt,
+    peek_jwt,
+    verify_jwt,
+    wall_clock,
+)
+from src.settings import JWTSettings
+
+
+def test_engine_tokens_are_readable_by_pyjwt():
+    token, payload = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, {"id": 1}, 60)
+
+    key = get_key_ring().active
+    assert jwt.get_unverified_header(token)["kid"] == key.kid
+    assert (
+        jwt.decode(token, key=key.verification_key, algorithms=[key.algorithm])
+        == payload
+    )
+    assert verify_jwt(token) == payload
+    assert peek_jwt(token) == payload
+
+
+def test_engine_verifies_pyjwt_tokens():
+    key = get_key_ring().active
+    _, payload = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, {"id": 1}, 60)
+    token = jwt.encode(
+        payload,
+        key=key.signing_key,
+        algorithm=key.algorithm,
+        headers={"kid": key.kid},
+    )
+
+    assert verify_jwt(token) == payload
+
+
+def test_verify_rejects_tampered_and_expired_tokens():
+    token, payload = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, {"id": 1}, 60)
+    header, _, signature = token.split(".")
+    forged, _ = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, {"id": 2}, 60)
+
+    with pytest.raises(jwt.InvalidSignatureError):
+        verify_jwt(f"{header}.{forged.split('.')[1]}.{signature}")
+    with pytest.raises(jwt.DecodeError):
+        verify_jwt("not-a-token")
+
+    expired = encode_jwt({**payload, "exp": wall_clock.now() - 1})
+    with pytest.raises(jwt.ExpiredSignatureError):
+        verify_jwt(expired)
+    assert decode_jwt(expired)["id"] == 1
+
+
+def test_verify_rejects_unknown_key_id():
+    key = get_key_ring().active
+    _, payload = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, {"id": 1}, 60)
+    token = jwt.encode(
+        payload,
+        key=key.signing_key,
+        algorithm=key.algorithm,
+        headers={"kid": "forged"},
+    )
+
+    with pytest.raises(jwt.InvalidTokenError):
+        verify_jwt(token)
+    with pytest.raises(HTTPException) as exc_info:
+        _verify_token(token)
+    assert exc_info.value is UNABLE_DECODE_JWT_EXCEPTION
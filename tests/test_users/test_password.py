@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from src.api.v1.users.utils import password
+from src.api.v1.users.utils.password import (
+    PasswordHasherPool,
+    hash_password,
+    verify_password,
+)
+from src.settings import PasswordHashSettings
+
+PASSWORD = "Test_password22"
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_pool():
+    pool = PasswordHasherPool(max_workers=1)
+
+    hashed, *verified = await asyncio.gather(
+        pool.run(hash_password, PASSWORD),
+        pool.run(verify_password, PASSWORD, hash_password(PASSWORD)),
+        pool.run(verify_password, "wrong", hash_password(PASSWORD)),
+    )
+    pool.shutdown()
+
+    assert verify_password(PASSWORD, hashed)
+    assert verified == [True, False]
+
+    stats = pool.stats()
+    assert stats["completed"] == 3
+    assert stats["queued"] == stats["running"] == 0
+    assert stats["wait_ms_max"] > 0
+
+
+def test_verify_and_update_upgrades_bcrypt_hash(monkeypatch):
+    bcrypt_hash = password.create_crypt_context(
+        scheme=PasswordHashSettings.BCRYPT_SCHEME, bcrypt_rounds=4
+    ).hash(PASSWORD)
+    monkeypatch.setattr(
+        password,
+        "pwd_context",
+        password.create_crypt_context(
+            scheme=PasswordHashSettings.ARGON2_SCHEME,
+            argon2_time_cost=1,
+            argon2_memory_cost=1024,
+            argon2_parallelism=1,
+        ),
+    )
+
+    assert password.verify_and_update_password("wrong", bcrypt_hash) == (
+        False,
+        None,
+    )
+    verified, new_hash = password.verify_and_update_password(
+        PASSWORD, bcrypt_hash
+    )
+    assert verified
+    assert new_hash.startswith("$argon2id$")
+    assert password.verify_and_update_password(PASSWORD, new_hash) == (
+        True,
+        None,
+    )
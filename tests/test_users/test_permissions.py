@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+
+import pytest
+
+from src.api.exceptions import NOT_FOUND
+from src.api.v1.admin.dependencies import (
+    check_admin_role,
+    check_metrics_permission,
+)
+from src.api.v1.users import dependencies
+from src.api.v1.users.dependencies import get_token_permissions
+from src.api.v1.users.utils.my_jwt import create_access_token
+from src.api.v1.users.utils.permissions import (
+    ROLE_PERMISSIONS_VERSION,
+    Permission,
+    role_permissions,
+)
+from src.api.v1.users.utils.token_store import InMemoryTokenStore
+
+ADMIN = SimpleNamespace(
+    id=1, email="admin@gmail.com", is_active=True, role="admin", role_version=0
+)
+
+
+def test_access_token_carries_permissions():
+    _, payload = create_access_token(ADMIN)
+
+    assert Permission(payload["perm"]) == role_permissions("admin")
+    assert payload["pv"] == ROLE_PERMISSIONS_VERSION
+    assert payload["rv"] == ADMIN.role_version
+    assert role_permissions("unknown") == Permission(0)
+
+
+@pytest.mark.asyncio
+async def test_permissions_are_read_from_claims(monkeypatch):
+    async def get_user(email):
+        raise AssertionError("user must not be loaded")
+
+    monkeypatch.setattr(dependencies, "get_principal_by_email", get_user)
+    _, payload = create_access_token(ADMIN)
+
+    permissions = await get_token_permissions(payload, InMemoryTokenStore())
+    assert Permission.MANAGE_USERS in permissions
+    check_admin_role(permissions)
+    check_metrics_permission(permissions)
+
+
+@pytest.mark.asyncio
+async def test_stale_permissions_are_rechecked(monkeypatch):
+    async def get_user(email):
+        return SimpleNamespace(role="user")
+
+    monkeypatch.setattr(dependencies, "get_principal_by_email", get_user)
+    token_store = InMemoryTokenStore()
+    _, payload = create_access_token(ADMIN)
+    _, stale_mapping = create_access_token(ADMIN)
+    stale_mapping["pv"] = ROLE_PERMISSIONS_VERSION - 1
+
+    assert await get_token_permissions(
+        stale_mapping, token_store
+    ) == role_permissions("user")
+
+    await token_store.set_role_version(ADMIN.id, 1)
+    await token_store.set_role_version(ADMIN.id, 0)
+    permissions = await get_token_permissions(payload, token_store)
+    assert permissions == role_permissions("user")
+    for check_permission in (check_admin_role, check_metrics_permission):
+        with pytest.raises(HTTPException) as exc_info:
+            check_permission(permissions)
+        assert exc_info.value is NOT_FOUND
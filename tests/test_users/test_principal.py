@@ -0,0 +1,48 @@
+from dataclasses import FrozenInstanceError
+from datetime import datetime
+
+import pytest
+
+from src.api.v1.users.utils.principal import AuthPrincipal
+from src.db.models import User
+
+NOW = datetime(2024, 1, 1, 12, 30)
+
+
+def create_user() -> User:
+    return User(
+        id=1,
+        email="user@gmail.com",
+        password="hashed_password",
+        first_name="Name",
+        last_name="Last",
+        role="user",
+        balance=10,
+        is_active=True,
+        is_blocked=False,
+        is_deleted=False,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+
+def test_principal_from_user_is_slotted_and_immutable():
+    principal = AuthPrincipal.from_user(create_user())
+
+    assert (principal.id, principal.email, principal.balance) == (
+        1,
+        "user@gmail.com",
+        10,
+    )
+    assert not hasattr(principal, "__dict__")
+    assert not hasattr(principal, "password")
+    with pytest.raises(FrozenInstanceError):
+        principal.role = "admin"
+
+
+def test_principal_cached_values_round_trip():
+    principal = AuthPrincipal.from_user(create_user())
+
+    values = principal.cached_values()
+    assert values["created_at"] == NOW.isoformat()
+    assert AuthPrincipal.from_cached_values(values) == principal
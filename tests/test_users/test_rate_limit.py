@@ -0,0 +1,50 @@
+from fastapi import HTTPException
+
+import pytest
+
+from src.api.v1.users.dependencies import enforce_rate_limits
+from src.api.v1.users.utils.rate_limit import (
+    InMemoryRateLimiter,
+    get_redis_rate_limiter,
+)
+from src.settings import RateLimit
+from tests.test_users.mock import MockRedisClient
+
+
+@pytest.mark.asyncio
+async def test_in_memory_rate_limiter_sliding_window(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("time.time", lambda: now)
+    rate_limiter = InMemoryRateLimiter()
+    rate_limit = RateLimit(limit=2, window_seconds=10)
+
+    assert await rate_limiter.hit("key", rate_limit) == 0
+    now += 4
+    assert await rate_limiter.hit("key", rate_limit) == 0
+    assert await rate_limiter.hit("key", rate_limit) == 6
+    assert await rate_limiter.hit("other", rate_limit) == 0
+
+    now += 6
+    assert await rate_limiter.hit("key", rate_limit) == 0
+
+
+@pytest.mark.asyncio
+async def test_enforce_rate_limits():
+    rate_limiter = InMemoryRateLimiter()
+    limits = (
+        ("ip", RateLimit(limit=5, window_seconds=60)),
+        ("email", RateLimit(limit=1, window_seconds=60)),
+    )
+
+    await enforce_rate_limits(rate_limiter, *limits)
+    with pytest.raises(HTTPException) as exc_info:
+        await enforce_rate_limits(rate_limiter, *limits)
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "60"}
+
+
+def test_redis_rate_limiter_is_built_once_per_client():
+    redis = MockRedisClient()
+
+    assert get_redis_rate_limiter(redis) is get_redis_rate_limiter(redis)
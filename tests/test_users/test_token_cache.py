@@ -0,0 +1,44 @@
+import time
+
+from src.api.v1.users.utils.token_cache import TokenPayloadCache
+
+
+def test_token_cache_hit_and_miss():
+    cache = TokenPayloadCache(max_size=2, ttl_seconds=60)
+    payload = {"sub": "user@gmail.com", "exp": int(time.time()) + 60}
+
+    assert cache.get("digest") is None
+    cache.set("digest", payload)
+    assert cache.get("digest") == payload
+
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_token_cache_lru_eviction():
+    cache = TokenPayloadCache(max_size=2, ttl_seconds=60)
+    exp = int(time.time()) + 60
+
+    cache.set("first", {"exp": exp})
+    cache.set("second", {"exp": exp})
+    cache.get("first")
+    cache.set("third", {"exp": exp})
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_token_cache_expires_with_token():
+    cache = TokenPayloadCache(max_size=2, ttl_seconds=60)
+    cache.set("expired", {"exp": int(time.time()) - 1})
+
+    assert cache.get("expired") is None
+
+
+def test_token_cache_invalidate():
+    cache = TokenPayloadCache(max_size=2, ttl_seconds=60)
+    cache.set("digest", {"exp": int(time.time()) + 60})
+    cache.invalidate("digest")
+
+    assert cache.get("digest") is None
@@ -0,0 +1,127 @@
+import pytest
+
+from src.api.v1.users.utils.my_jwt import create_jwt
+from src.api.v1.users.utils.token_store import (
+    InMemoryTokenStore,
+    RedisTokenStore,
+    RotationResult,
+    get_redis_token_store,
+    sessions_key,
+    token_key,
+)
+from src.settings import JWTSettings
+from tests.test_users.mock import MockRedisClient
+
+
+@pytest.mark.asyncio
+async def test_token_store_save_and_get():
+    token_store = InMemoryTokenStore()
+    access = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, {"sub": "a"}, 60)
+    refresh = create_jwt(JWTSettings.REFRESH_TOKEN_TYPE, {"sub": "a"}, 60)
+
+    await token_store.save(access, refresh)
+
+    assert await token_store.get(access[0]) == access[1]
+    assert await token_store.get(refresh[0]) == refresh[1]
+
+
+@pytest.mark.asyncio
+async def test_token_store_revoke():
+    token_store = InMemoryTokenStore()
+    token, payload = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, {}, 60)
+    await token_store.save((token, payload))
+
+    await token_store.revoke(token, payload)
+
+    assert await token_store.get(token) is None
+    assert await token_store.is_revoked(payload)
+
+
+def test_token_key_is_fixed_length():
+    short_key = token_key("a")
+    long_key = token_key("a" * 1000)
+
+    assert len(short_key) == len(long_key)
+
+
+@pytest.mark.asyncio
+async def test_token_store_revoke_all():
+    token_store = InMemoryTokenStore()
+    claims = {"id": 1, "sid": "session", "gen": 0}
+    access = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, claims, 60)
+    refresh = create_jwt(JWTSettings.REFRESH_TOKEN_TYPE, claims, 120)
+    await token_store.save(access, refresh)
+
+    sessions = await token_store.get_sessions(1)
+    assert sessions == [("session", refresh[1]["exp"])]
+
+    await token_store.revoke_all(1)
+
+    assert await token_store.get_generation(1) == 1
+    assert await token_store.get_sessions(1) == []
+    assert await token_store.get(refresh[0]) is None
+    assert await token_store.is_revoked(access[1])
+
+
+@pytest.mark.asyncio
+async def test_token_store_rotate_and_reuse():
+    token_store = InMemoryTokenStore()
+    claims = {"id": 1, "sid": "family", "gen": 0}
+    first = create_jwt(JWTSettings.REFRESH_TOKEN_TYPE, claims, 120)
+    second = create_jwt(JWTSettings.REFRESH_TOKEN_TYPE, claims, 120)
+    access = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, claims, 60)
+    await token_store.save(first)
+
+    result = await token_store.rotate(*first, second, access)
+    assert result is RotationResult.ROTATED
+    assert await token_store.get(second[0]) == second[1]
+
+    result = await token_store.rotate(*first, second)
+    assert result is RotationResult.REUSED
+    assert await token_store.get(second[0]) is None
+    assert await token_store.is_revoked(access[1])
+
+
+@pytest.mark.asyncio
+async def test_redis_token_store_keeps_longest_sessions_ttl():
+    redis = MockRedisClient()
+    token_store = RedisTokenStore(redis)
+    claims = {"id": 1, "sid": "session", "gen": 0}
+    refresh = create_jwt(JWTSettings.REFRESH_TOKEN_TYPE, claims, 1200)
+    access = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, claims, 60)
+
+    await token_store.save(refresh, access)
+    assert await redis.ttl(sessions_key(1)) > 60
+
+    second_login = {**claims, "sid": "second"}
+    await token_store.save(
+        create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, second_login, 60)
+    )
+    assert await redis.ttl(sessions_key(1)) > 60
+
+
+@pytest.mark.asyncio
+async def test_token_store_revoke_ends_session():
+    claims = {"id": 1, "sid": "session", "gen": 0}
+    access = create_jwt(JWTSettings.ACCESS_TOKEN_TYPE, claims, 60)
+    token_store = InMemoryTokenStore()
+    await token_store.save(access)
+
+    await token_store.revoke(*access)
+
+    assert await token_store.get_sessions(1) == []
+
+    redis = MockRedisClient()
+    token_store = RedisTokenStore(redis)
+    await token_store.save(access)
+
+    await token_store.revoke(*access)
+
+    assert not await redis.exists(sessions_key(1))
+
+
+def test_redis_token_store_is_built_once_per_client():
+    redis = MockRedisClient()
+
+    assert get_redis_token_store(redis) is get_redis_token_store(redis)
+    assert get_redis_token_store(MockRedisClient()).redis is not redis
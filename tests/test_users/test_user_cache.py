@@ -0,0 +1,108 @@
+import pytest
+
+from src.api.v1.users.utils.user_cache import UserCache
+from tests.test_users.mock import MockRedisClient
+
+USER = {"id": 1, "email": "user@gmail.com", "balance": 10}
+
+
+class MockPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def incr(self, name):
+        self.commands.append(self.redis.incr(name))
+
+    def delete(self, name):
+        self.commands.append(self.redis.delete(name))
+
+    def publish(self, channel, message):
+        self.redis.published.append(message)
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+class MockVersionedRedis(MockRedisClient):
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    async def mget(self, *names):
+        return [self.store.get(name) for name in names]
+
+    async def incr(self, name):
+        self.store[name] = int(self.store.get(name, 0)) + 1
+        return self.store[name]
+
+    def pipeline(self, transaction=True):
+        return MockPipeline(self)
+
+
+def create_cache(redis=None) -> UserCache:
+    return UserCache(
+        max_size=2,
+        local_ttl_seconds=60,
+        ttl_seconds=60,
+        get_redis=None if redis is None else lambda: redis,
+    )
+
+
+@pytest.mark.asyncio
+async def test_user_cache_local_hit_and_invalidate():
+    cache = create_cache()
+
+    assert await cache.get(1, USER["email"]) == (None, 0)
+    await cache.set(1, 0, USER)
+    assert await cache.get(1, USER["email"]) == (USER, 0)
+    assert await cache.get(1, "other@gmail.com") == (None, 0)
+
+    await cache.invalidate(1)
+    assert await cache.get(1, USER["email"]) == (None, 1)
+    assert cache.stats()["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_user_cache_shared_tier_is_versioned():
+    redis = MockVersionedRedis()
+    writer, reader = create_cache(redis), create_cache(redis)
+
+    _, version = await writer.get(1, USER["email"])
+    await writer.set(1, version, USER)
+    assert await reader.get(1, USER["email"]) == (USER, 0)
+    assert reader.stats()["shared_hits"] == 1
+
+    # a row loaded before a concurrent update is ignored afterwards
+    _, stale_version = await create_cache(redis).get(1, USER["email"])
+    await writer.invalidate(1)
+    await writer.set(1, stale_version, USER)
+    reader.invalidate_local(1)
+    assert await reader.get(1, USER["email"]) == (None, 1)
+    assert await writer.get(1, USER["email"]) == (None, 1)
+    assert redis.published == ["user_record:1"]
+
+
+@pytest.mark.asyncio
+async def test_user_cache_skips_rows_loaded_before_invalidation():
+    cache = create_cache()
+
+    _, version = await cache.get(1, USER["email"])
+    await cache.invalidate(1)
+    await cache.set(1, version, USER)
+
+    assert (await cache.get(1, USER["email"]))[0] is None
+
+
+@pytest.mark.asyncio
+async def test_disabled_user_cache():
+    cache = UserCache(max_size=0, local_ttl_seconds=60, ttl_seconds=60)
+
+    await cache.set(1, 0, USER)
+    assert await cache.get(1, USER["email"]) == (None, 0)
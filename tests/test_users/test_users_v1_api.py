@@ -1,3 +1,5 @@
+from fastapi import HTTPException
+
 from sqlalchemy import select
 
 import pytest
@@ -6,11 +8,15 @@ from httpx import AsyncClient
 from src.api.exceptions import (
     BLOCKED_USER_EXCEPTION,
     CREDENTIAL_EXCEPTIONS,
+    EXPIRED_TOKEN_EXCEPTION,
     NOT_ACTIVE_USER_EXCEPTION,
+    REFRESH_TOKEN_REUSED_EXCEPTION,
+    REVOKED_TOKEN_ERROR,
 )
+from src.api.v1.users.dependencies import get_token_payload
 from src.api.v1.users.models.token import (
-    AccessTokenSchema,
     RevokedAccessTokenSchema,
+    SessionsResponseSchema,
     TokenSchema,
 )
 from src.api.v1.users.models.user import (
@@ -18,10 +24,16 @@ from src.api.v1.users.models.user import (
     DeleteUserSchema,
     UserResponseSchema,
 )
-from src.api.v1.users.utils.my_jwt import decode_jwt
+from src.api.v1.users.utils.my_jwt import (
+    create_access_token,
+    create_jwt,
+    decode_jwt,
+)
 from src.api.v1.users.utils.password import verify_password
+from src.api.v1.users.utils.token_store import InMemoryTokenStore
 from src.db.models import User
 from src.db.session import s
+from src.settings import JWTSettings
 from tests.test_users.conftest import (
     MOCK_USER_EMAIL,
     TEST_IN_ACTIVE_USER_EMAIL,
@@ -29,6 +41,7 @@ from tests.test_users.conftest import (
     TEST_USER_PASSWORD,
 )
 
+
 USERS_API_V1 = "/api/v1/users"
 
 
@@ -150,11 +163,71 @@ async def test_logout(
 
 
 @pytest.mark.asyncio
-async def test_refresh(async_test_client: AsyncClient):
+async def test_get_sessions(
+    async_test_client: AsyncClient, test_mock_user: User
+):
+    login_data = {"email": MOCK_USER_EMAIL, "password": TEST_USER_PASSWORD}
+    await async_test_client.post(f"{USERS_API_V1}/login/", json=login_data)
+
+    response = await async_test_client.get(f"{USERS_API_V1}/sessions/")
+
+    assert response.status_code == 200
+    assert SessionsResponseSchema.model_validate(response.json())
+    assert response.json()["sessions"]
+
+
+@pytest.mark.asyncio
+async def test_logout_ends_session(
+    async_test_client: AsyncClient, test_mock_user: User
+):
+    login_data = {"email": MOCK_USER_EMAIL, "password": TEST_USER_PASSWORD}
+    response = await async_test_client.post(
+        f"{USERS_API_V1}/login/", json=login_data
+    )
+    access_token = response.json()["access_token"]
+    session_id = decode_jwt(access_token)["sid"]
+    async_test_client.headers["Authorization"] = f"Bearer {access_token}"
+
+    await async_test_client.post(f"{USERS_API_V1}/logout/")
+    response = await async_test_client.get(f"{USERS_API_V1}/sessions/")
+
+    assert response.status_code == 200
+    sessions = response.json()["sessions"]
+    assert session_id not in [session["session_id"] for session in sessions]
+
+
+@pytest.mark.asyncio
+async def test_refresh(async_test_client: AsyncClient, test_users: None):
+    login_data = {"email": TEST_USER_EMAIL, "password": TEST_USER_PASSWORD}
+    login_response = await async_test_client.post(
+        f"{USERS_API_V1}/login/", json=login_data
+    )
+    refresh_token = login_response.json()["refresh_token"]
+    async_test_client.headers["Authorization"] = f"Bearer {refresh_token}"
+
     response = await async_test_client.post(f"{USERS_API_V1}/refresh/")
 
     assert response.status_code == 201
-    assert AccessTokenSchema.model_validate(response.json())
+    assert TokenSchema.model_validate(response.json())
+    assert response.json()["refresh_token"] != refresh_token
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_reuse(
+    async_test_client: AsyncClient, test_users: None
+):
+    login_data = {"email": TEST_USER_EMAIL, "password": TEST_USER_PASSWORD}
+    login_response = await async_test_client.post(
+        f"{USERS_API_V1}/login/", json=login_data
+    )
+    refresh_token = login_response.json()["refresh_token"]
+    async_test_client.headers["Authorization"] = f"Bearer {refresh_token}"
+
+    await async_test_client.post(f"{USERS_API_V1}/refresh/")
+    response = await async_test_client.post(f"{USERS_API_V1}/refresh/")
+
+    assert response.status_code == REFRESH_TOKEN_REUSED_EXCEPTION.status_code
+    assert response.json()["detail"] == REFRESH_TOKEN_REUSED_EXCEPTION.detail
 
 
 @pytest.mark.asyncio
@@ -284,3 +357,40 @@ async def test_update_user(async_test_client: AsyncClient):
     assert test_updated_user.email == "new_email@gmail.com"
     assert test_updated_user.first_name == "New First Name"
     assert test_updated_user.last_name == "New Last Name"
+
+
+@pytest.mark.asyncio
+async def test_local_verification_mode(monkeypatch):
+    monkeypatch.setattr(
+        JWTSettings,
+        "VERIFICATION_MODE",
+        JWTSettings.LOCAL_VERIFICATION_MODE,
+    )
+    token_store = InMemoryTokenStore()
+    user = User(id=1, email=TEST_USER_EMAIL, is_active=True)
+    access_token, access_payload = create_access_token(user)
+
+    payload = await get_token_payload(access_token, token_store)
+    assert payload["sub"] == TEST_USER_EMAIL
+    assert isinstance(payload["exp"], int)
+
+    await token_store.revoke(access_token, access_payload)
+    with pytest.raises(HTTPException) as exc_info:
+        await get_token_payload(access_token, token_store)
+    assert exc_info.value is REVOKED_TOKEN_ERROR
+
+
+@pytest.mark.asyncio
+async def test_local_verification_expired_token(monkeypatch):
+    monkeypatch.setattr(
+        JWTSettings,
+        "VERIFICATION_MODE",
+        JWTSettings.LOCAL_VERIFICATION_MODE,
+    )
+    expired_token, _ = create_jwt(
+        JWTSettings.ACCESS_TOKEN_TYPE, {"sub": TEST_USER_EMAIL}, -10
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_token_payload(expired_token, InMemoryTokenStore())
+    assert exc_info.value is EXPIRED_TOKEN_EXCEPTION